@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from .routes import database
 from .routes import packages
 from .routes import emissions
@@ -11,6 +12,9 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# Compress larger JSON bodies (leaderboards, timelines, table previews)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Include all route modules
 app.include_router(database.router)
 app.include_router(packages.router)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session, select, text
 
 from ..database import get_session
@@ -6,38 +6,39 @@ from fastapi import HTTPException
 
 router = APIRouter(prefix="/db", tags=["database"])
 
+# Constant queries built once at import rather than on every request
+NOW_QUERY = text("""select now()""")
+PUBLIC_TABLES_QUERY = text("""
+    SELECT table_name
+    FROM information_schema.tables
+    WHERE table_schema = 'public'
+""")
+
 @router.get("/health")
 async def health_check(db: Session = Depends(get_session)):
     """Check database connection health."""
-    query = text("""select now()""")
-    result = db.exec(query).one()
+    result = db.exec(NOW_QUERY).one()
     return {"status": "healthy", "database_time": result[0]}
 
 @router.get("/tables")
 async def get_tables(db: Session = Depends(get_session)):
     """Get all tables in the public schema."""
-    query = text("""
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-    """)
-    results = db.exec(query).all()
+    results = db.exec(PUBLIC_TABLES_QUERY).all()
     return {"tables": [row[0] for row in results]}
 
 @router.get("/tables/{table_name}")
-async def get_table_data(table_name: str, db: Session = Depends(get_session)):
-    """Get all data from a specific table."""
+async def get_table_data(
+    table_name: str,
+    limit: int = Query(500, ge=1, le=1000, description="Rows to return"),
+    db: Session = Depends(get_session)
+):
+    """Get up to `limit` rows from a specific table."""
     # Prevent SQL injection by checking if the table name is valid
-    tables_query = text("""
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-    """)
-    tables = db.exec(tables_query).all()
+    tables = db.exec(PUBLIC_TABLES_QUERY).all()
     if (table_name,) not in tables:
         raise HTTPException(status_code=404, detail="Table not found")
 
-    query = text(f"SELECT * FROM {table_name}")
+    query = text(f"SELECT * FROM {table_name} LIMIT :limit").bindparams(limit=limit)
     result = db.exec(query)
     columns = result.keys()
     rows = result.fetchall()
@@ -8,16 +8,44 @@ from ..models import Package, Carrier, Emission, PackageRead
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 
 
+@router.get("/students/count")
+async def get_student_leaderboard_count(
+    db: Session = Depends(get_session),
+    major: str = Query(None, description="Filter by major/department")
+    ):
+    """
+    Number of rows in the student leaderboard, for paginating it.
+    """
+    major_filter = "and d.department_name = :major" if major else ""
+    query = text(f"""
+        SELECT COUNT(*) FROM (
+            SELECT 1
+            FROM persons p
+            LEFT JOIN departments d ON p.wpi_id = d.person_id
+            WHERE p.is_student = TRUE {major_filter}
+            GROUP BY p.wpi_id, d.department_name
+        ) AS rows
+    """)
+    if major:
+        query = query.bindparams(major=major)
+
+    return {"total": db.exec(query).one()[0]}
+
 @router.get("/students")
 async def get_student_leaderboard(
     db: Session = Depends(get_session),
-    major: str = Query(None, description="Filter by major/department")
+    major: str = Query(None, description="Filter by major/department"),
+    limit: int = Query(None, ge=1, le=100, description="Rows to return (default all)"),
+    offset: int = Query(0, ge=0, description="Rows to skip")
     ):
     """
     Leaderboard of students ranked by total carbon emissions (kg CO2).
     Includes student name, total emissions, and their major/department.
+    Pass limit/offset to fetch a single page; ranks stay global.
     """
-    major_filter = f"and d.department_name = '{major}'" if major else ""
+    # User input only ever reaches the database as bound parameters
+    major_filter = "and d.department_name = :major" if major else ""
+    page_clause = "LIMIT :limit OFFSET :offset" if limit else ""
     query = text(f"""
         SELECT 
             p.first_name,
@@ -30,13 +58,19 @@ async def get_student_leaderboard(
         LEFT JOIN departments d ON p.wpi_id = d.person_id
         WHERE p.is_student = TRUE {major_filter}
         GROUP BY p.wpi_id, d.department_name
-        ORDER BY total_emissions DESC
+        ORDER BY total_emissions DESC, p.wpi_id
+        {page_clause}
     """)
+    if major:
+        query = query.bindparams(major=major)
+    if limit:
+        query = query.bindparams(limit=limit, offset=offset)
 
     results = db.exec(query).all()
 
     leaderboard = []
-    for rank, (first_name, last_name, wpi_id, emissions, major) in enumerate(results, start=1):
+    start = (offset if limit else 0) + 1
+    for rank, (first_name, last_name, wpi_id, emissions, major) in enumerate(results, start=start):
         leaderboard.append({
             "rank": rank,
             "name": f"{first_name} {last_name}",  # anonymized display
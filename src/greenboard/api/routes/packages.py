@@ -101,9 +101,11 @@ async def get_package_by_tracking(
 @router.get("/student/{wpi_id}", response_model=List[PackageRead])
 async def get_packages_by_student(
     wpi_id: str,
+    limit: int = Query(None, ge=1, le=100, description="Items to return (default all)"),
+    offset: int = Query(0, ge=0, description="Items to skip"),
     db: Session = Depends(get_session)
 ):
-    """Get all packages by student WPI ID."""
+    """Get packages by student WPI ID, newest first; all of them unless limit is given."""
 
     statement = (
         select(
@@ -117,7 +119,10 @@ async def get_packages_by_student(
         )
         .where(Package.recipient_id == wpi_id)
         .join(Carrier, Package.carrier_id == Carrier.carrier_id, isouter=True)
+        .order_by(Package.date_shipped.desc(), Package.package_id)
     )
+    if limit:
+        statement = statement.offset(offset).limit(limit)
     
     results = db.exec(statement).all()
     
@@ -13,7 +13,8 @@ import pandas as pd
 import time
 from typing import Dict, Optional, List
 from datetime import datetime
-from emissions_calculator import calculate_package_emissions, EmissionResult, print_emissions_report
+from emissions_calculator import calculate_package_emissions, EmissionResult, print_emissions_report, credentials_from_env
+from emissions_config import compute_full_emissions
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
@@ -168,7 +169,7 @@ class BatchEmissionsProcessor:
             print(f"\n❌ Error saving results: {e}")
         
         # Print summary
-        self._print_summary(elapsed_time)
+        self._print_summary(results_df, elapsed_time)
         
         return results_df
     
@@ -320,13 +321,13 @@ class BatchEmissionsProcessor:
             }
     
     def _emission_result_to_dict(self, result: EmissionResult) -> Dict:
-        """Convert EmissionResult to a flat dictionary for CSV export"""
+        """
+        Convert EmissionResult to a flat dictionary for CSV export.
+        Emissions, unit conversions, equivalents and rounding are applied
+        per column in _create_results_dataframe.
+        """
         pkg = result.package_info
         
-        # Calculate environmental equivalents
-        trees_needed = result.total_emissions_kg / 21
-        miles_driven = result.total_emissions_kg / 0.404
-        
         return {
             'tracking_number': pkg.tracking_number,
             'carrier': pkg.carrier,
@@ -335,8 +336,7 @@ class BatchEmissionsProcessor:
             'service_code': pkg.service_code,
             
             # Weight
-            'weight_kg': round(result.weight_used_kg, 3),
-            'weight_lbs': round(result.weight_used_kg * 2.20462, 3),
+            'weight_kg': result.weight_used_kg,
             'is_dimensional_weight': result.is_dimensional,
             
             # Route
@@ -346,21 +346,17 @@ class BatchEmissionsProcessor:
             'destination_city': pkg.destination.city if pkg.destination else None,
             'destination_state': pkg.destination.state if pkg.destination else None,
             'destination_country': pkg.destination.country if pkg.destination else None,
-            'distance_km': round(result.distance_km, 2),
-            'distance_miles': round(result.distance_km * 0.621371, 2),
+            'distance_km': result.distance_km,
             
             # Emissions
             'transport_mode': result.transport_mode,
-            'emission_factor': round(result.emission_factor, 4),
-            'total_emissions_kg_co2e': round(result.total_emissions_kg, 4),
-            'main_transit_emissions_kg': round(result.breakdown[0]['emissions_kg'], 4) if result.breakdown else 0,
-            'last_mile_emissions_kg': round(result.breakdown[1]['emissions_kg'], 4) if len(result.breakdown) > 1 else 0,
+            'emission_factor': result.emission_factor,
             
-            # Environmental context
-            'trees_needed_1_year': round(trees_needed, 2),
-            'equivalent_miles_driven': round(miles_driven, 1),
+            'error_message': None,
             
-            'error_message': None
+            # Last-mile leg inputs; shipments without one contribute zero
+            '_last_mile_km': result.breakdown[1].distance_km if len(result.breakdown) > 1 else 0.0,
+            '_last_mile_factor': result.breakdown[1].emission_factor if len(result.breakdown) > 1 else 0.0,
         }
     
     def _create_results_dataframe(self, original_df: pd.DataFrame) -> pd.DataFrame:
@@ -371,6 +367,39 @@ class BatchEmissionsProcessor:
         if '_index' in results_df.columns:
             results_df = results_df.drop(columns=['_index'])
         
+        # Derived columns as whole-column operations (only present if something succeeded)
+        if 'weight_kg' in results_df.columns:
+            main, last, total = compute_full_emissions(
+                results_df['weight_kg'].to_numpy(dtype=float),
+                results_df['distance_km'].to_numpy(dtype=float),
+                results_df['_last_mile_km'].to_numpy(dtype=float),
+                results_df['emission_factor'].to_numpy(dtype=float),
+                results_df['_last_mile_factor'].to_numpy(dtype=float),
+            )
+            emissions_at = results_df.columns.get_loc('emission_factor') + 1
+            results_df.insert(emissions_at, 'total_emissions_kg_co2e', total)
+            results_df.insert(emissions_at + 1, 'main_transit_emissions_kg', main)
+            results_df.insert(emissions_at + 2, 'last_mile_emissions_kg', last)
+            results_df = results_df.drop(columns=['_last_mile_km', '_last_mile_factor'])
+            
+            emissions = results_df['total_emissions_kg_co2e']
+            results_df.insert(results_df.columns.get_loc('weight_kg') + 1, 'weight_lbs',
+                              (results_df['weight_kg'] * 2.20462).round(3))
+            results_df.insert(results_df.columns.get_loc('distance_km') + 1, 'distance_miles',
+                              (results_df['distance_km'] * 0.621371).round(2))
+            results_df.insert(results_df.columns.get_loc('last_mile_emissions_kg') + 1, 'trees_needed_1_year',
+                              (emissions / 21).round(2))
+            results_df.insert(results_df.columns.get_loc('trees_needed_1_year') + 1, 'equivalent_miles_driven',
+                              (emissions / 0.404).round(1))
+            results_df = results_df.round({
+                'weight_kg': 3,
+                'distance_km': 2,
+                'emission_factor': 4,
+                'total_emissions_kg_co2e': 4,
+                'main_transit_emissions_kg': 4,
+                'last_mile_emissions_kg': 4,
+            })
+        
         # Merge with original data to preserve any additional columns
         if 'tracking_number' in original_df.columns:
             results_df = original_df.merge(
@@ -382,7 +411,7 @@ class BatchEmissionsProcessor:
         
         return results_df
     
-    def _print_summary(self, elapsed_time: float = None):
+    def _print_summary(self, results_df: pd.DataFrame, elapsed_time: float = None):
         """Print summary statistics"""
         total = len(self.results)
         successful = sum(1 for r in self.results if r.get('status') == 'success')
@@ -401,11 +430,7 @@ class BatchEmissionsProcessor:
             print(f"📈 Throughput: {total/elapsed_time:.2f} packages/sec")
         
         if successful > 0:
-            total_emissions = sum(
-                r.get('total_emissions_kg_co2e', 0) 
-                for r in self.results 
-                if r.get('status') == 'success'
-            )
+            total_emissions = results_df['total_emissions_kg_co2e'].sum()
             avg_emissions = total_emissions / successful
             
             print(f"\n🌍 Total Emissions: {total_emissions:.4f} kg CO2e")
@@ -424,28 +449,11 @@ class BatchEmissionsProcessor:
 
 
 if __name__ == "__main__":
-    # Set up credentials for all carriers
+    # Set up credentials for all carriers from <CARRIER>_CLIENT_ID /
+    # <CARRIER>_CLIENT_SECRET; Amazon is simulated and needs none
     credentials = {
-        'ups': {
-            'client_id': 'HCTsyp8JsmGuiOYCkxpZAak9ZusNbA8Me9d1k5g7rmivxpoC',
-            'client_secret': 'bbUGGCg1q66AuEeGV66EjhcbG6GNtOGYTb1r5vqAxssUaBsovaQIKPiTWHHpAGZV'
-        },
-        'usps': {
-            'client_id': 'vrBISZnb8yn4KTNm0SA0UAA4yqlDfGdEFHkfARJzWgizAzGq',
-            'client_secret': '13b8Ius4epIhNbIlz2s9KIlAOT0JVkSqnBGjtD6q5rnW5TRHrchLZYBfwUAaM51Y'
-        },
-        'fedex': {
-            'client_id': 'l74673b0ec87d749268da2b0e59460429c',
-            'client_secret': '4e8527a4c6614ef386672eebeb086223'
-        },
-        'dhl': {
-            'client_id': 'JLOAsRhxyRDiU4hyT1w4ueexJlqSMVqg',
-            'client_secret': 'cMI8ojXzljz32GhE'
-        },
-        'amazon': {
-            'client_id': None,
-            'client_secret': None
-        }
+        carrier: credentials_from_env(carrier)
+        for carrier in ('ups', 'usps', 'fedex', 'dhl', 'amazon')
     }
     
     # Process the CSV
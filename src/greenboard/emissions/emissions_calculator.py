@@ -6,18 +6,35 @@ Includes accurate geocoding for distance calculation.
 """
 
 import requests
-import uuid
+import asyncio
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import secrets
+import hashlib
+import itertools
+import bisect
 import base64
-from typing import Dict, Optional, List, Tuple, Any
-from dataclasses import dataclass, asdict
+import re
+import inspect
+from typing import Dict, Optional, List, Tuple, Any, NamedTuple, Callable
+from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from geopy.distance import geodesic
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-import json
+import orjson
 import time
+import random
 import pickle
 import os
+import logging
+from threading import Lock
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
@@ -47,6 +64,36 @@ EMISSION_FACTORS = {
     }
 }
 
+# Weight unit (lowercased, as reported by carrier APIs) -> kg multiplier
+_UNIT_TO_KG = {
+    'lbs': 0.453592,
+    'lb': 0.453592,
+    'kgs': 1.0,
+    'kg': 1.0,
+    'oz': 0.0283495,
+}
+
+# Metric dimensional-weight divisors (cm^3 per kg), the metric equivalents of
+# the inch-based 'dimensional_factors' above
+DIMENSIONAL_DIVISORS_CM = {
+    'ups': 5000,
+    'fedex': 5000,
+    'dhl': 5000,
+    'usps': 6000,
+}
+
+# OAuth token lifetime to assume when a carrier omits expires_in, and how long
+# before expiry a cached token is refreshed (seconds)
+DEFAULT_TOKEN_TTL = 3300
+TOKEN_EXPIRY_MARGIN = 300
+
+# (connect, read) timeouts in seconds for carrier API calls
+AUTH_TIMEOUT = (3.05, 10)
+TRACK_TIMEOUT = (3.05, 20)
+
+# Most tracking responses kept per adapter for conditional GETs
+TRACKING_CACHE_SIZE = 256
+
 DEFAULT_DISTANCES = {
     'domestic_ground': 1200,
     'domestic_air': 1500,
@@ -54,12 +101,49 @@ DEFAULT_DISTANCES = {
     'last_mile': 10
 }
 
+# Last-mile leg added to every non-last-mile shipment
+_LAST_MILE_KM = DEFAULT_DISTANCES['last_mile']
+_LAST_MILE_FACTOR = EMISSION_FACTORS['tonne_km']['last_mile']
+
+
+def _compile_path(*paths: Tuple) -> Callable[[Any], Any]:
+    """
+    Compile key/index paths into one straight-line accessor for parsed JSON.
+    Paths are tried in order; the accessor returns the first value found, else None.
+    """
+    lines = ["def _get(data):"]
+    for path in paths:
+        lines += [
+            "    try:",
+            "        value = data" + "".join(f"[{key!r}]" for key in path),
+            "        if value is not None:",
+            "            return value",
+            "    except (KeyError, IndexError, TypeError):",
+            "        pass",
+        ]
+    lines.append("    return None")
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), namespace)
+    return namespace["_get"]
+
+
+def _address_from(addr: Optional[Dict], city_key: str, state_key: str) -> Optional['Address']:
+    """Build an Address from a carrier address block; None if the block is missing"""
+    if not isinstance(addr, dict):
+        return None
+    return Address(
+        city=addr.get(city_key),
+        state=addr.get(state_key),
+        postal_code=addr.get('postalCode'),
+        country=addr.get('countryCode', 'US')
+    )
+
 
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Address:
     """Standardized address structure"""
     street: Optional[str] = None
@@ -71,24 +155,24 @@ class Address:
     longitude: Optional[float] = None
     
     def to_string(self) -> str:
-        parts = []
-        if self.street:
-            parts.append(self.street)
-        if self.city:
-            parts.append(self.city)
-        if self.state:
-            parts.append(self.state)
-        if self.postal_code:
-            parts.append(self.postal_code)
-        if self.country:
-            parts.append(self.country)
-        return ", ".join(filter(None, parts))
+        return ", ".join(
+            part for part in (self.street, self.city, self.state, self.postal_code, self.country)
+            if part
+        )
     
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            'street': self.street,
+            'city': self.city,
+            'state': self.state,
+            'postal_code': self.postal_code,
+            'country': self.country,
+            'latitude': self.latitude,
+            'longitude': self.longitude
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class PackageInfo:
     """Standardized package information structure"""
     tracking_number: str
@@ -105,19 +189,34 @@ class PackageInfo:
         if not self.dimensions:
             return None
         length, width, height = self.dimensions
-        volume_cm3 = length * width * height
-        return volume_cm3 / 5000
+        divisor = DIMENSIONAL_DIVISORS_CM.get(carrier.lower(), EMISSION_FACTORS['dimensional_factors']['metric_air'])
+        return (length * width * height) / divisor
     
     def to_dict(self) -> dict:
-        data = asdict(self)
-        if self.origin:
-            data['origin'] = self.origin.to_dict()
-        if self.destination:
-            data['destination'] = self.destination.to_dict()
-        return data
+        return {
+            'tracking_number': self.tracking_number,
+            'weight_kg': self.weight_kg,
+            'dimensions': self.dimensions,
+            'origin': self.origin.to_dict() if self.origin else None,
+            'destination': self.destination.to_dict() if self.destination else None,
+            'service_code': self.service_code,
+            'service_description': self.service_description,
+            'carrier': self.carrier,
+            'pickup_date': self.pickup_date
+        }
+
+
+class Segment(NamedTuple):
+    """One leg of an emissions breakdown"""
+    segment: str
+    mode: str
+    distance_km: float
+    weight_kg: float
+    emission_factor: float
+    emissions_kg: float
 
 
-@dataclass
+@dataclass(slots=True)
 class EmissionResult:
     """Container for emission calculation results"""
     total_emissions_kg: float
@@ -126,7 +225,7 @@ class EmissionResult:
     distance_km: float
     transport_mode: str
     emission_factor: float
-    breakdown: List[Dict]
+    breakdown: List[Segment]
     package_info: PackageInfo
     
     def to_dict(self) -> dict:
@@ -137,7 +236,7 @@ class EmissionResult:
             'distance_km': self.distance_km,
             'transport_mode': self.transport_mode,
             'emission_factor': self.emission_factor,
-            'breakdown': self.breakdown,
+            'breakdown': [seg._asdict() for seg in self.breakdown],
             'package_info': self.package_info.to_dict()
         }
 
@@ -161,7 +260,7 @@ class DistanceCalculator:
             try:
                 with open(self.cache_file, 'rb') as f:
                     cache = pickle.load(f)
-                    print(f"✓ Loaded {len(cache)} cached locations")
+                    logger.info("✓ Loaded %d cached locations", len(cache))
                     return cache
             except Exception:
                 return {}
@@ -195,7 +294,7 @@ class DistanceCalculator:
         return "|".join(parts)
     
     def geocode_city(self, city: Optional[str], state: Optional[str], 
-                     country: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+                     country: Optional[str], max_retries: int = 1) -> Tuple[Optional[float], Optional[float]]:
         """Geocode a city location (faster and more reliable than full addresses)"""
         cache_key = self._make_cache_key(city, state, country)
         if not cache_key:
@@ -219,17 +318,23 @@ class DistanceCalculator:
         
         query = ", ".join(query_parts)
         
-        try:
-            self._rate_limit()
-            location = self.geocoder.geocode(query)
-            
-            if location:
-                coords = (location.latitude, location.longitude)
-                self.cache[cache_key] = coords
-                self._save_cache()
-                return coords
-        except Exception:
-            pass
+        for attempt in range(max_retries + 1):
+            try:
+                self._rate_limit()
+                location = self.geocoder.geocode(query)
+                
+                if location:
+                    coords = (location.latitude, location.longitude)
+                    self.cache[cache_key] = coords
+                    self._save_cache()
+                    return coords
+                break
+            except (GeocoderTimedOut, GeocoderServiceError):
+                if attempt < max_retries:
+                    # Exponential backoff with jitter so concurrent workers don't retry in lockstep
+                    time.sleep(min(8.0, 0.5 * (2 ** attempt)) + random.random() * 0.25)
+            except Exception:
+                break
         
         # Cache the failure to avoid retrying
         self.cache[cache_key] = (None, None)
@@ -237,19 +342,19 @@ class DistanceCalculator:
     
     def geocode_address(self, address: Address, max_retries: int = 1) -> Tuple[Optional[float], Optional[float]]:
         """Geocode using city-level data from address"""
-        if address.latitude and address.longitude:
+        if address.latitude is not None and address.longitude is not None:
             return address.latitude, address.longitude
         
         # Use city-level geocoding (much faster)
-        return self.geocode_city(address.city, address.state, address.country)
+        return self.geocode_city(address.city, address.state, address.country, max_retries)
     
     def calculate_distance(self, origin: Address, destination: Address, 
                           service_type: str = 'ground') -> float:
         """Calculate distance between cities or use service-based estimates"""
         
-        # Try geocoding cities
-        origin_coords = self.geocode_city(origin.city, origin.state, origin.country)
-        dest_coords = self.geocode_city(destination.city, destination.state, destination.country)
+        # Use known coordinates where present, otherwise geocode the cities
+        origin_coords = self.geocode_address(origin)
+        dest_coords = self.geocode_address(destination)
         
         # If both geocoded successfully, calculate actual distance
         if origin_coords[0] and dest_coords[0]:
@@ -274,11 +379,142 @@ class DistanceCalculator:
 # CARRIER ADAPTER INTERFACE
 # ============================================================================
 
+def _build_session() -> requests.Session:
+    """HTTP session with a connection pool large enough for the batch processor's workers"""
+    session = requests.Session()
+    # Rate limits and transient 5xx are retried on the same pooled connection,
+    # honouring Retry-After. POST is included since FedEx tracks via POST and
+    # token requests are safe to repeat.
+    retries = Retry(
+        total=4,
+        backoff_factor=0.4,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "POST"),
+        respect_retry_after_header=True,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32,
+                                          pool_block=False, max_retries=retries))
+    return session
+
+
+def _log_error_response(e: requests.exceptions.RequestException, include_status: bool = False):
+    """Log the start of a carrier error body; skipped entirely when ERROR logging is off"""
+    response = e.response
+    if response is None or not logger.isEnabledFor(logging.ERROR):
+        return
+    if include_status:
+        logger.error("   Status: %s", response.status_code)
+    logger.error("   Response: %s", response.content[:512].decode('utf-8', 'replace'))
+
+
+def _decode_json(response: requests.Response) -> Any:
+    """Decode a response body with orjson; raises requests' JSONDecodeError like response.json()"""
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+
+
+@lru_cache(maxsize=32)
+def _basic_auth_header(client_id: str, client_secret: str) -> str:
+    """Basic auth header value, base64-encoded once per credential pair"""
+    return "Basic " + base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+
+
+# Pre-encoded form body for client-credentials token requests
+_CLIENT_CREDENTIALS_BODY = b"grant_type=client_credentials"
+
+# Service descriptions like "Priority Mail" map onto upper snake case codes
+_SERVICE_CODE_NORMALIZE = str.maketrans(' ', '_')
+
+# Shared by every adapter so auth and tracking calls reuse keep-alive connections
+_SESSION = _build_session()
+
+
 class CarrierAdapter(ABC):
     """Abstract base class for carrier-specific adapters"""
     
+    _session: requests.Session = _SESSION
+    
+    # Service code (upper snake case) -> transport mode; overridden per carrier
+    SERVICE_TO_MODE: Dict[str, str] = {'default': 'truck_average'}
+    
+    # Shared across instances: cache key -> (access token, monotonic expiry time).
+    # The key hashes the credentials, so one adapter can serve several credential sets
+    _token_cache: Dict[str, Tuple[str, float]] = {}
+    _token_cache_lock = Lock()
+    # cache key -> lock held while fetching that key's token, so concurrent
+    # callers on a cold cache wait for one request instead of each making their own
+    _token_fetch_locks: Dict[str, Lock] = {}
+    # Constant headers for tracking calls; Authorization is added per token
+    TRACK_HEADERS: Dict[str, str] = {}
+    _auth_headers: Optional[Tuple[str, Dict[str, str]]] = None
+    
+    def authenticate(self, credentials: Dict[str, str], force_refresh: bool = False) -> Optional[str]:
+        """
+        Return a cached access token, requesting a new one when missing or near expiry.
+        
+        Args:
+            credentials: Carrier credentials
+            force_refresh: Skip the cache and always request a new token
+        """
+        cache_key = self._token_cache_key(credentials)
+        if not force_refresh:
+            token = self._cached_token(cache_key)
+            if token:
+                return token
+        
+        with self._token_cache_lock:
+            fetch_lock = self._token_fetch_locks.setdefault(cache_key, Lock())
+        with fetch_lock:
+            # Another thread may have fetched the token while this one waited
+            if not force_refresh:
+                token = self._cached_token(cache_key)
+                if token:
+                    return token
+            
+            token_data = self._request_token(credentials)
+            if not token_data or not token_data.get("access_token"):
+                return None
+            
+            token = token_data["access_token"]
+            try:
+                expires_in = float(token_data.get("expires_in", DEFAULT_TOKEN_TTL))
+            except (TypeError, ValueError):
+                expires_in = DEFAULT_TOKEN_TTL
+            with self._token_cache_lock:
+                self._token_cache[cache_key] = (token, time.monotonic() + max(0.0, expires_in - TOKEN_EXPIRY_MARGIN))
+            return token
+    
+    def _cached_token(self, cache_key: str) -> Optional[str]:
+        """Cached token for cache_key if it is not near expiry"""
+        cached = self._token_cache.get(cache_key)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        return None
+    
+    def invalidate_token(self, token: str):
+        """Drop a token the carrier rejected so the next authenticate() fetches a new one"""
+        with self._token_cache_lock:
+            for cache_key, (cached_token, _) in list(self._token_cache.items()):
+                if cached_token == token:
+                    del self._token_cache[cache_key]
+    
+    def _track_headers(self, token: str) -> Dict[str, str]:
+        """Tracking request headers for token, rebuilt only when the token rotates"""
+        cached = self._auth_headers
+        if cached is None or cached[0] != token:
+            cached = (token, {**self.TRACK_HEADERS, "Authorization": f"Bearer {token}"})
+            self._auth_headers = cached
+        return cached[1]
+    
+    def _token_cache_key(self, credentials: Dict[str, str]) -> str:
+        key = f"{type(self).__name__}|{getattr(self, 'base_url', '')}|{credentials.get('client_id')}|{credentials.get('client_secret')}"
+        return hashlib.sha256(key.encode()).hexdigest()
+    
     @abstractmethod
-    def authenticate(self, credentials: Dict[str, str]) -> Optional[str]:
+    def _request_token(self, credentials: Dict[str, str]) -> Optional[Dict]:
+        """Fetch a new OAuth token; returns the token response JSON"""
         pass
     
     @abstractmethod
@@ -289,9 +525,16 @@ class CarrierAdapter(ABC):
     def parse_tracking_data(self, tracking_data: Dict) -> Optional[PackageInfo]:
         pass
     
-    @abstractmethod
-    def get_transport_mode(self, service_code: str) -> str:
-        pass
+    @classmethod
+    def get_transport_mode(cls, service_code: str) -> str:
+        """Map a service code to a transport mode; SERVICE_TO_MODE keys are already canonical"""
+        mode = cls.SERVICE_TO_MODE.get(service_code)
+        if mode is None:
+            mode = cls.SERVICE_TO_MODE.get(
+                service_code.upper().translate(_SERVICE_CODE_NORMALIZE),
+                cls.SERVICE_TO_MODE['default']
+            )
+        return mode
 
 
 # ============================================================================
@@ -301,6 +544,12 @@ class CarrierAdapter(ABC):
 class UPSAdapter(CarrierAdapter):
     """UPS-specific implementation"""
     
+    # Package node for the current and legacy response casings
+    _package = staticmethod(_compile_path(
+        ('trackResponse', 'shipment', 0, 'package', 0),
+        ('TrackResponse', 'Shipment', 'Package', 0),
+    ))
+    
     SERVICE_TO_MODE = {
         '01': 'air_shorthaul',
         '02': 'air_shorthaul',
@@ -319,72 +568,121 @@ class UPSAdapter(CarrierAdapter):
         'default': 'truck_average'
     }
     
+    TRACK_HEADERS = {"transactionSrc": "wpi_greenboard"}
+    # Skip the signature image, proof-of-delivery and milestone blocks; only
+    # the package weight, service and addresses are parsed
+    TRACK_PARAMS = {"returnSignature": "false", "returnPOD": "false", "returnMilestones": "false"}
+    # Tracking/inquiry numbers are alphanumeric once spacing is removed;
+    # anything else never reaches the URL
+    TRACKING_NUMBER_RE = re.compile(r"\A[A-Z0-9]{7,35}\Z")
+    _TRACKING_NUMBER_STRIP = str.maketrans('', '', ' -')
+    
     def __init__(self, production: bool = False):
         self.production = production
-        self.base_url = "https://onlinetools.ups.com" 
-    def authenticate(self, credentials: Dict[str, str]) -> Optional[str]:
+        self.base_url = "https://onlinetools.ups.com"
+        self._track_url = f"{self.base_url}/api/track/v1/details/{{}}".format
+        # transId only needs to be unique per request: random prefix + counter
+        self._trans_prefix = secrets.token_hex(8)
+        self._trans_counter = itertools.count()
+        # tracking_number -> (validators, parsed JSON) for conditional GETs;
+        # LRU-bounded since the shared adapter lives for the whole process
+        self._tracking_cache: 'OrderedDict[str, Tuple[Dict[str, str], Dict]]' = OrderedDict()
+        self._tracking_cache_lock = Lock()
+    
+    def _get_cached_tracking(self, tracking_number: str) -> Optional[Tuple[Dict[str, str], Dict]]:
+        with self._tracking_cache_lock:
+            cached = self._tracking_cache.get(tracking_number)
+            if cached is not None:
+                self._tracking_cache.move_to_end(tracking_number)
+            return cached
+    
+    def _store_cached_tracking(self, tracking_number: str, entry: Tuple[Dict[str, str], Dict]):
+        with self._tracking_cache_lock:
+            self._tracking_cache[tracking_number] = entry
+            self._tracking_cache.move_to_end(tracking_number)
+            if len(self._tracking_cache) > TRACKING_CACHE_SIZE:
+                self._tracking_cache.popitem(last=False)
+    
+    def _request_token(self, credentials: Dict[str, str]) -> Optional[Dict]:
         token_url = f"{self.base_url}/security/v1/oauth/token"
-        payload = {"grant_type": "client_credentials"}
+        headers = {
+            "Authorization": _basic_auth_header(credentials['client_id'], credentials['client_secret']),
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 token_url,
-                data=payload,
-                auth=(credentials['client_id'], credentials['client_secret'])
+                data=_CLIENT_CREDENTIALS_BODY,
+                headers=headers,
+                timeout=AUTH_TIMEOUT
             )
             response.raise_for_status()
-            return response.json().get("access_token")
+            return _decode_json(response)
         except requests.exceptions.RequestException as e:
-            print(f"❌ UPS authentication error: {e}")
+            logger.error("❌ UPS authentication error: %s", e)
             return None
     
     def get_tracking_data(self, token: str, tracking_number: str) -> Optional[Dict]:
-        track_url = f"{self.base_url}/api/track/v1/details/{tracking_number}"
+        # "1Z 999 AA1 01 2345 6784" and "1z999aa10123456784" are the same number
+        normalized = tracking_number.translate(self._TRACKING_NUMBER_STRIP).upper()
+        if not self.TRACKING_NUMBER_RE.match(normalized):
+            logger.error("❌ Invalid UPS tracking number: %r", tracking_number)
+            return None
+        tracking_number = normalized
+        track_url = self._track_url(tracking_number)
         headers = {
-            "Authorization": f"Bearer {token}",
-            "transId": str(uuid.uuid4()),
-            "transactionSrc": "wpi_greenboard"
+            **self._track_headers(token),
+            "transId": f"{self._trans_prefix}{next(self._trans_counter):08x}"
         }
         
+        cached = self._get_cached_tracking(tracking_number)
+        if cached:
+            headers.update(cached[0])
+        
         try:
-            response = requests.get(track_url, headers=headers)
+            response = self._session.get(track_url, headers=headers, params=self.TRACK_PARAMS,
+                                         timeout=TRACK_TIMEOUT)
             response.raise_for_status()
-            return response.json()
+            if response.status_code == 304 and cached:
+                return cached[1]
+            
+            tracking_data = _decode_json(response)
+            validators = {}
+            if 'ETag' in response.headers:
+                validators['If-None-Match'] = response.headers['ETag']
+            if 'Last-Modified' in response.headers:
+                validators['If-Modified-Since'] = response.headers['Last-Modified']
+            if validators:
+                self._store_cached_tracking(tracking_number, (validators, tracking_data))
+            return tracking_data
         except requests.exceptions.RequestException as e:
-            print(f"❌ UPS tracking error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Response: {e.response.text}")
+            logger.error("❌ UPS tracking error: %s", e)
+            if e.response is not None and e.response.status_code == 401:
+                self.invalidate_token(token)
+            _log_error_response(e)
             return None
     
     def parse_tracking_data(self, tracking_data: Dict) -> Optional[PackageInfo]:
         try:
             # Navigate to package level
-            if 'trackResponse' in tracking_data:
-                shipment = tracking_data['trackResponse']['shipment'][0]
-                package = shipment.get('package', [{}])[0]
-            elif 'TrackResponse' in tracking_data:
-                shipment = tracking_data['TrackResponse']['Shipment']
-                package = shipment.get('Package', [{}])[0]
-            else:
-                print(f"❌ Unknown UPS response structure")
+            package = self._package(tracking_data)
+            if package is None:
+                logger.error("❌ Unknown UPS response structure")
                 return None
             
             # Extract weight
             weight_kg = None
-            weight_lb = None
             
             if 'weight' in package:
                 weight_data = package['weight']
-                unit = weight_data.get('unitOfMeasurement', 'LBS').upper()
-                weight_value = float(weight_data.get('weight', 5.0))
-                
-                if unit == 'KGS':
-                    weight_kg = weight_value
-                else:  # LBS
-                    weight_lb = weight_value
-                    weight_kg = weight_lb * 0.453592
-                    
-            print(f"Parsed weight: {weight_kg:.2f} kg ({(weight_kg * 2.20462):.2f} lbs)")
+                unit = (weight_data.get('unitOfMeasurement') or 'lbs').lower()
+                weight_kg = float(weight_data.get('weight', 5.0)) * _UNIT_TO_KG.get(unit, _UNIT_TO_KG['lbs'])
+            
+            if weight_kg is None:
+                logger.error("❌ No weight in UPS response")
+                return None
+            logger.debug("Parsed weight: %.2f kg (%.2f lbs)", weight_kg, weight_kg * 2.20462)
 
             # Extract addresses
             addresses = package.get('packageAddress', [])
@@ -425,14 +723,9 @@ class UPSAdapter(CarrierAdapter):
                 carrier='UPS'
             )
             
-        except Exception as e:
-            print(f"❌ Error parsing UPS data: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ Error parsing UPS data")
             return None
-    
-    def get_transport_mode(self, service_code: str) -> str:
-        return self.SERVICE_TO_MODE.get(service_code, self.SERVICE_TO_MODE['default'])
 
 
 # ============================================================================
@@ -453,11 +746,17 @@ class USPSAdapter(CarrierAdapter):
         'default': 'truck_average'
     }
     
+    # v3 and legacy response layouts
+    _track_info = staticmethod(_compile_path(
+        ('trackResults', 0),
+        ('TrackResults', 'TrackInfo'),
+    ))
+    
     def __init__(self, production: bool = False):
         self.production = production
         self.base_url = "https://apis.usps.com"
     
-    def authenticate(self, credentials: Dict[str, str]) -> Optional[str]:
+    def _request_token(self, credentials: Dict[str, str]) -> Optional[Dict]:
         token_url = f"{self.base_url}/oauth2/v3/token"
         
         payload = {
@@ -469,43 +768,36 @@ class USPSAdapter(CarrierAdapter):
         headers = {"Content-Type": "application/json"}
         
         try:
-            response = requests.post(token_url, json=payload, headers=headers)
+            response = self._session.post(token_url, json=payload, headers=headers, timeout=AUTH_TIMEOUT)
             response.raise_for_status()
-            return response.json().get("access_token")
+            return _decode_json(response)
         except requests.exceptions.RequestException as e:
-            print(f"❌ USPS authentication error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Response: {e.response.text}")
+            logger.error("❌ USPS authentication error: %s", e)
+            _log_error_response(e)
             return None
     
     def get_tracking_data(self, token: str, tracking_number: str) -> Optional[Dict]:
         track_url = f"{self.base_url}/tracking/v3/tracking/{tracking_number}"
         
-        headers = {
-            "Authorization": f"Bearer {token}"
-            # "Content-Type": "application/json"
-        }
-        
         params = {"expand": "summary"}
         
         try:
-            response = requests.get(track_url, headers=headers, params=params)
+            response = self._session.get(track_url, headers=self._track_headers(token), params=params,
+                                         timeout=TRACK_TIMEOUT)
             response.raise_for_status()
-            return response.json()
+            return _decode_json(response)
         except requests.exceptions.RequestException as e:
-            print(f"❌ USPS tracking error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Response: {e.response.text}")
+            logger.error("❌ USPS tracking error: %s", e)
+            if e.response is not None and e.response.status_code == 401:
+                self.invalidate_token(token)
+            _log_error_response(e)
             return None
     
     def parse_tracking_data(self, tracking_data: Dict) -> Optional[PackageInfo]:
         try:
-            if 'trackResults' in tracking_data:
-                track_info = tracking_data['trackResults'][0]
-            elif 'TrackResults' in tracking_data:
-                track_info = tracking_data['TrackResults']['TrackInfo']
-            else:
-                print(f"❌ Unknown USPS response structure")
+            track_info = self._track_info(tracking_data)
+            if track_info is None:
+                logger.error("❌ Unknown USPS response structure")
                 return None
             
             # Weight (often not provided by USPS)
@@ -513,7 +805,7 @@ class USPSAdapter(CarrierAdapter):
             if 'weight' in track_info:
                 weight_kg = float(track_info['weight']) * 0.453592
             
-            print(f"  ⚠️ USPS weight: {weight_kg:.2f} kg (estimated)")
+            logger.debug("  ⚠️ USPS weight: %.2f kg (estimated)", weight_kg)
             
             # Addresses
             origin = None
@@ -535,7 +827,7 @@ class USPSAdapter(CarrierAdapter):
                     country='US'
                 )
             
-            service_type = track_info.get('class', 'PRIORITY').upper().replace(' ', '_')
+            service_type = track_info.get('class', 'PRIORITY').upper().translate(_SERVICE_CODE_NORMALIZE)
             service_desc = track_info.get('classDescription', 'Priority Mail')
             tracking_num = track_info.get('trackingNumber', 'Unknown')
             
@@ -550,14 +842,9 @@ class USPSAdapter(CarrierAdapter):
                 carrier='USPS'
             )
             
-        except Exception as e:
-            print(f"❌ Error parsing USPS data: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ Error parsing USPS data")
             return None
-    
-    def get_transport_mode(self, service_code: str) -> str:
-        return self.SERVICE_TO_MODE.get(service_code.upper(), self.SERVICE_TO_MODE['default'])
 
 
 # ============================================================================
@@ -583,11 +870,21 @@ class FedExAdapter(CarrierAdapter):
         'default': 'truck_average'
     }
     
+    TRACK_HEADERS = {
+        "Content-Type": "application/json",
+        "X-locale": "en_US"
+    }
+    
+    _track_results = staticmethod(_compile_path(('output', 'completeTrackResults', 0, 'trackResults', 0)))
+    _weights = staticmethod(_compile_path(('packageDetails', 'weightAndDimensions', 'weight')))
+    _origin = staticmethod(_compile_path(('shipperInformation', 'address')))
+    _destination = staticmethod(_compile_path(('recipientInformation', 'address')))
+    
     def __init__(self, production: bool = False):
         self.production = production
         self.base_url = "https://apis.fedex.com" 
     
-    def authenticate(self, credentials: Dict[str, str]) -> Optional[str]:
+    def _request_token(self, credentials: Dict[str, str]) -> Optional[Dict]:
         token_url = f"{self.base_url}/oauth/token"
         
         payload = {
@@ -599,26 +896,19 @@ class FedExAdapter(CarrierAdapter):
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         
         try:
-            response = requests.post(token_url, data=payload, headers=headers)
+            response = self._session.post(token_url, data=payload, headers=headers, timeout=AUTH_TIMEOUT)
             response.raise_for_status()
-            return response.json().get("access_token")
+            return _decode_json(response)
         except requests.exceptions.RequestException as e:
-            print(f"❌ FedEx authentication error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Response: {e.response.text}")
+            logger.error("❌ FedEx authentication error: %s", e)
+            _log_error_response(e)
             return None
     
     def get_tracking_data(self, token: str, tracking_number: str) -> Optional[Dict]:
         track_url = f"{self.base_url}/track/v1/trackingnumbers"
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "X-locale": "en_US"
-        }
-        
         payload = {
-            "includeDetailedScans": True,
+            "includeDetailedScans": False,  # scan events are never read
             "trackingInfo": [{
                 "trackingNumberInfo": {
                     "trackingNumber": tracking_number
@@ -627,64 +917,37 @@ class FedExAdapter(CarrierAdapter):
         }
         
         try:
-            response = requests.post(track_url, json=payload, headers=headers)
+            response = self._session.post(track_url, json=payload, headers=self._track_headers(token),
+                                          timeout=TRACK_TIMEOUT)
             response.raise_for_status()
             # print(response.json())
-            return response.json()
+            return _decode_json(response)
         except requests.exceptions.RequestException as e:
-            print(f"❌ FedEx tracking error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Response: {e.response.text}")
+            logger.error("❌ FedEx tracking error: %s", e)
+            if e.response is not None and e.response.status_code == 401:
+                self.invalidate_token(token)
+            _log_error_response(e)
             return None
     
     def parse_tracking_data(self, tracking_data: Dict) -> Optional[PackageInfo]:
         try:
-            if 'output' not in tracking_data:
-                print("❌ No output in FedEx response")
+            track_results = self._track_results(tracking_data)
+            if track_results is None:
+                logger.error("❌ No output in FedEx response")
                 return None
             
-            complete_track_results = tracking_data['output']['completeTrackResults'][0]
-            track_results = complete_track_results['trackResults'][0]
-            
             # Weight
             weight_kg = 2.27  # Default
-            if 'packageDetails' in track_results:
-                package_details = track_results['packageDetails']
-                for weight_info in package_details['weightAndDimensions']['weight']:
-                    weight_value = float(weight_info.get('value', 5.0))
-                    unit = weight_info.get('unit', 'LB')
-                    
-                    if unit == 'KG':
-                        weight_kg = weight_value
-                    else:
-                        weight_kg = weight_value * 0.453592
+            for weight_info in self._weights(track_results) or ():
+                unit = (weight_info.get('unit') or 'lb').lower()
+                weight_kg = float(weight_info.get('value', 5.0)) * _UNIT_TO_KG.get(unit, _UNIT_TO_KG['lb'])
             
             
             # Addresses
-            origin = None
-            destination = None
-            
-            if 'shipperInformation' in track_results:
-                shipper = track_results['shipperInformation']
-                if 'address' in shipper:
-                    addr = shipper['address']
-                    origin = Address(
-                        city=addr.get('city'),
-                        state=addr.get('stateOrProvinceCode'),
-                        postal_code=addr.get('postalCode'),
-                        country=addr.get('countryCode', 'US')
-                    )
-            
-            if 'recipientInformation' in track_results:
-                recipient = track_results['recipientInformation']
-                if 'address' in recipient:
-                    addr = recipient['address']
-                    destination = Address(
-                        city=addr.get('city'),
-                        state=addr.get('stateOrProvinceCode'),
-                        postal_code=addr.get('postalCode'),
-                        country=addr.get('countryCode', 'US')
-                    )
+            origin = _address_from(self._origin(track_results),
+                                   'city', 'stateOrProvinceCode')
+            destination = _address_from(self._destination(track_results),
+                                        'city', 'stateOrProvinceCode')
             
             service_detail = track_results.get('serviceDetail', {})
             service_code = service_detail.get('type', 'FEDEX_GROUND')
@@ -702,14 +965,9 @@ class FedExAdapter(CarrierAdapter):
                 carrier='FedEx'
             )
             
-        except Exception as e:
-            print(f"❌ Error parsing FedEx data: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ Error parsing FedEx data")
             return None
-    
-    def get_transport_mode(self, service_code: str) -> str:
-        return self.SERVICE_TO_MODE.get(service_code.upper(), self.SERVICE_TO_MODE['default'])
 
 
 # ============================================================================
@@ -729,6 +987,13 @@ class DHLAdapter(CarrierAdapter):
         'default': 'air_longhaul'
     }
     
+    TRACK_HEADERS = {"Content-Type": "application/json"}
+    
+    _shipment = staticmethod(_compile_path(('shipments', 0)))
+    _weight = staticmethod(_compile_path(('details', 'weight')))
+    _origin = staticmethod(_compile_path(('origin', 'address')))
+    _destination = staticmethod(_compile_path(('destination', 'address')))
+    
     def __init__(self, production: bool = False):
         self.production = production
         if production:
@@ -736,16 +1001,12 @@ class DHLAdapter(CarrierAdapter):
         else:
             self.base_url = "https://api-sandbox.dhlecs.com"
     
-    def authenticate(self, credentials: Dict[str, str]) -> Optional[str]:
+    def _request_token(self, credentials: Dict[str, str]) -> Optional[Dict]:
         """Authenticate with DHL eCommerce Americas API"""
         token_url = f"{self.base_url}/auth/v1/token"
         
-        # Basic Auth with base64
-        auth_string = f"{credentials['client_id']}:{credentials['client_secret']}"
-        auth_b64 = base64.b64encode(auth_string.encode()).decode()
-        
         headers = {
-            "Authorization": f"Basic {auth_b64}",
+            "Authorization": _basic_auth_header(credentials['client_id'], credentials['client_secret']),
             "Accept": "application/json"
         }
         
@@ -755,87 +1016,57 @@ class DHLAdapter(CarrierAdapter):
         }
         
         try:
-            response = requests.post(token_url, headers=headers, params=params)
+            response = self._session.post(token_url, headers=headers, params=params, timeout=AUTH_TIMEOUT)
             response.raise_for_status()
-            return response.json().get("access_token")
+            return _decode_json(response)
         except requests.exceptions.RequestException as e:
-            print(f"❌ DHL authentication error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Status: {e.response.status_code}")
-                print(f"   Response: {e.response.text}")
+            logger.error("❌ DHL authentication error: %s", e)
+            _log_error_response(e, include_status=True)
             return None
     
     def get_tracking_data(self, token: str, tracking_number: str) -> Optional[Dict]:
         """Fetch DHL tracking data"""
         track_url = f"{self.base_url}/track/shipments"
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        
         params = {"trackingNumber": tracking_number}
         
         try:
-            response = requests.get(track_url, headers=headers, params=params)
+            response = self._session.get(track_url, headers=self._track_headers(token), params=params,
+                                         timeout=TRACK_TIMEOUT)
             response.raise_for_status()
-            return response.json()
+            return _decode_json(response)
         except requests.exceptions.RequestException as e:
-            print(f"❌ DHL tracking error: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Response: {e.response.text}")
+            logger.error("❌ DHL tracking error: %s", e)
+            if e.response is not None and e.response.status_code == 401:
+                self.invalidate_token(token)
+            _log_error_response(e)
             return None
     
     def parse_tracking_data(self, tracking_data: Dict) -> Optional[PackageInfo]:
         """Parse DHL tracking data"""
         try:
-            if 'shipments' not in tracking_data:
-                print("❌ No shipments in DHL response")
+            shipment = self._shipment(tracking_data)
+            if shipment is None:
+                logger.error("❌ No shipments in DHL response")
                 return None
             
-            shipment = tracking_data['shipments'][0]
-            
             # Weight
             weight_kg = 2.27  # Default
-            if 'details' in shipment and 'weight' in shipment['details']:
-                weight_info = shipment['details']['weight']
-                weight_value = float(weight_info.get('value', 5.0))
-                unit = weight_info.get('unitText', 'kg')
-                
-                if unit.lower() == 'lb':
-                    weight_kg = weight_value * 0.453592
-                else:
-                    weight_kg = weight_value
+            weight_info = self._weight(shipment)
+            if weight_info is not None:
+                unit = (weight_info.get('unitText') or 'kg').lower()
+                weight_kg = float(weight_info.get('value', 5.0)) * _UNIT_TO_KG.get(unit, _UNIT_TO_KG['kg'])
             
             
             # Addresses
-            origin = None
-            destination = None
-            
-            if 'origin' in shipment:
-                origin_info = shipment['origin']
-                if 'address' in origin_info:
-                    addr = origin_info['address']
-                    origin = Address(
-                        city=addr.get('cityName'),
-                        state=addr.get('provinceCode'),
-                        postal_code=addr.get('postalCode'),
-                        country=addr.get('countryCode', 'US')
-                    )
-            
-            if 'destination' in shipment:
-                dest_info = shipment['destination']
-                if 'address' in dest_info:
-                    addr = dest_info['address']
-                    destination = Address(
-                        city=addr.get('cityName'),
-                        state=addr.get('provinceCode'),
-                        postal_code=addr.get('postalCode'),
-                        country=addr.get('countryCode', 'US')
-                    )
+            origin = _address_from(self._origin(shipment),
+                                   'cityName', 'provinceCode')
+            destination = _address_from(self._destination(shipment),
+                                        'cityName', 'provinceCode')
             
-            service_code = shipment.get('service', {}).get('code', 'EXPRESS_WORLDWIDE')
-            service_desc = shipment.get('service', {}).get('name', 'Express Worldwide')
+            service = shipment.get('service', {})
+            service_code = service.get('code', 'EXPRESS_WORLDWIDE')
+            service_desc = service.get('name', 'Express Worldwide')
             tracking_num = shipment.get('id', 'Unknown')
             
             
@@ -849,23 +1080,14 @@ class DHLAdapter(CarrierAdapter):
                 carrier='DHL'
             )
             
-        except Exception as e:
-            print(f"❌ Error parsing DHL data: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ Error parsing DHL data")
             return None
-    
-    def get_transport_mode(self, service_code: str) -> str:
-        """Map DHL service code to transport mode"""
-        return self.SERVICE_TO_MODE.get(service_code.upper(), self.SERVICE_TO_MODE['default'])
 
 # ============================================================================
 # AMAZON ADAPTER WITH REALISTIC VARIATION
 # ============================================================================
 
-import random
-import hashlib
-
 class AmazonAdapter(CarrierAdapter):
     """Amazon-specific implementation using realistic estimation with variation"""
     
@@ -896,6 +1118,22 @@ class AmazonAdapter(CarrierAdapter):
         'AMAZON_FRESH': 0.05,        # 5% Fresh/Grocery
     }
     
+    # Upper bounds of the weight profile brackets: 20% small-light, 30% small-medium,
+    # 25% medium, 15% medium-heavy, 7% heavy, 3% extra heavy
+    WEIGHT_PROFILE_THRESHOLDS = (0.20, 0.50, 0.75, 0.90, 0.97)
+    WEIGHT_PROFILE_NAMES = ('small_light', 'small_medium', 'medium', 'medium_heavy', 'heavy', 'extra_heavy')
+    
+    SERVICE_DESCRIPTIONS = {
+        'AMAZON_PRIME': 'Amazon Prime 2-Day Delivery',
+        'AMAZON_SAME_DAY': 'Amazon Same-Day Delivery',
+        'AMAZON_STANDARD': 'Amazon Standard Shipping',
+        'AMAZON_FRESH': 'Amazon Fresh Delivery'
+    }
+    
+    # Cumulative SERVICE_TYPES probabilities for bisect
+    SERVICE_CODES = tuple(SERVICE_TYPES)
+    SERVICE_THRESHOLDS = tuple(itertools.accumulate(SERVICE_TYPES.values()))
+    
     SERVICE_TO_MODE = {
         'AMAZON_STANDARD': 'truck_average',
         'AMAZON_PRIME': 'truck_average',
@@ -908,9 +1146,9 @@ class AmazonAdapter(CarrierAdapter):
         self.production = production
         random.seed()  # Initialize random for real randomness
     
-    def authenticate(self, credentials: Dict[str, str]) -> Optional[str]:
+    def _request_token(self, credentials: Dict[str, str]) -> Optional[Dict]:
         """Amazon doesn't require authentication for our estimation approach"""
-        return "ESTIMATION_MODE"
+        return {"access_token": "ESTIMATION_MODE"}
     
     def _get_deterministic_random(self, tracking_number: str, seed_suffix: str = "") -> float:
         """Generate deterministic 'random' value from tracking number (0.0 to 1.0)"""
@@ -922,20 +1160,7 @@ class AmazonAdapter(CarrierAdapter):
     def _select_weight_profile(self, tracking_number: str) -> str:
         """Select weight profile based on tracking number"""
         rand_val = self._get_deterministic_random(tracking_number, "weight")
-        
-        # Distribution: 35% small, 30% medium, 20% medium-heavy, 10% heavy, 5% extra heavy
-        if rand_val < 0.20:
-            return 'small_light'
-        elif rand_val < 0.50:
-            return 'small_medium'
-        elif rand_val < 0.75:
-            return 'medium'
-        elif rand_val < 0.90:
-            return 'medium_heavy'
-        elif rand_val < 0.97:
-            return 'heavy'
-        else:
-            return 'extra_heavy'
+        return self.WEIGHT_PROFILE_NAMES[bisect.bisect_right(self.WEIGHT_PROFILE_THRESHOLDS, rand_val)]
     
     def _generate_weight(self, tracking_number: str) -> float:
         """Generate realistic weight based on tracking number"""
@@ -985,17 +1210,10 @@ class AmazonAdapter(CarrierAdapter):
         """Select service type based on tracking number"""
         rand_val = self._get_deterministic_random(tracking_number, "service")
         
-        cumulative = 0.0
-        for service, probability in self.SERVICE_TYPES.items():
-            cumulative += probability
-            if rand_val < cumulative:
-                descriptions = {
-                    'AMAZON_PRIME': 'Amazon Prime 2-Day Delivery',
-                    'AMAZON_SAME_DAY': 'Amazon Same-Day Delivery',
-                    'AMAZON_STANDARD': 'Amazon Standard Shipping',
-                    'AMAZON_FRESH': 'Amazon Fresh Delivery'
-                }
-                return service, descriptions[service]
+        i = bisect.bisect_right(self.SERVICE_THRESHOLDS, rand_val)
+        if i < len(self.SERVICE_CODES):
+            service = self.SERVICE_CODES[i]
+            return service, self.SERVICE_DESCRIPTIONS[service]
         
         return 'AMAZON_PRIME', 'Amazon Prime 2-Day Delivery'
     
@@ -1046,8 +1264,7 @@ class AmazonAdapter(CarrierAdapter):
         """
         tracking_number = tracking_data['tracking_number']
         
-        print("\n📦 Amazon Package Estimation (Intelligent Mode)")
-        print("   Using deterministic variation based on tracking number")
+        logger.debug("📦 Amazon Package Estimation (Intelligent Mode) for %s", tracking_number)
         
         # Generate characteristics
         weight_kg = self._generate_weight(tracking_number)
@@ -1079,7 +1296,7 @@ class AmazonAdapter(CarrierAdapter):
         )
         
         if dimensions:
-            print(f"  📏 Dimensions: {dimensions[0]}×{dimensions[1]}×{dimensions[2]} cm")
+            logger.debug("  📏 Dimensions: %s×%s×%s cm", *dimensions)
         
         return PackageInfo(
             tracking_number=tracking_number,
@@ -1091,9 +1308,6 @@ class AmazonAdapter(CarrierAdapter):
             service_description=service_desc,
             carrier='Amazon'
         )
-    
-    def get_transport_mode(self, service_code: str) -> str:
-        return self.SERVICE_TO_MODE.get(service_code, self.SERVICE_TO_MODE['default'])
 
 
 # ============================================================================
@@ -1111,20 +1325,56 @@ class CarrierFactory:
         'amazon': AmazonAdapter,
     }
     
+    @staticmethod
+    def _normalize(carrier: str) -> str:
+        return carrier if carrier.islower() else carrier.casefold()
+    
     @classmethod
-    def create_adapter(cls, carrier: str, **kwargs) -> CarrierAdapter:
-        carrier_lower = carrier.lower()
-        if carrier_lower not in cls._adapters:
+    def _adapter_class(cls, carrier: str) -> type:
+        adapter_class = cls._adapters.get(cls._normalize(carrier))
+        if adapter_class is None:
             raise ValueError(
                 f"Unsupported carrier: {carrier}. "
                 f"Supported carriers: {', '.join(cls._adapters.keys())}"
             )
-        return cls._adapters[carrier_lower](**kwargs)
+        return adapter_class
+    
+    @classmethod
+    def create_adapter(cls, carrier: str, **kwargs) -> CarrierAdapter:
+        return cls._adapter_class(carrier)(**kwargs)
+    
+    @classmethod
+    def get_adapter(cls, carrier: str, **kwargs) -> CarrierAdapter:
+        """
+        Shared adapter for a carrier and settings, created on first use.
+
+        Adapters hold no credentials, so the key is only the constructor
+        settings. Callers with different credential sets can share one
+        adapter: authenticate() caches tokens per credential hash (see
+        _token_cache_key), and every tracking call sends the caller's own token.
+        """
+        carrier = cls._normalize(carrier)
+        # Fill in constructor defaults so get_adapter("ups") and
+        # get_adapter("ups", production=False) share one adapter
+        bound = inspect.signature(cls._adapter_class(carrier)).bind(**kwargs)
+        bound.apply_defaults()
+        return cls._cached_adapter(carrier, tuple(sorted(bound.arguments.items())))
+    
+    @classmethod
+    @lru_cache(maxsize=16)
+    def _cached_adapter(cls, carrier: str, settings: Tuple[Tuple[str, Any], ...]) -> CarrierAdapter:
+        return cls.create_adapter(carrier, **dict(settings))
     
     @classmethod
     def register_adapter(cls, carrier: str, adapter_class: type):
         """Register a custom carrier adapter"""
-        cls._adapters[carrier.lower()] = adapter_class
+        cls._adapters[carrier.casefold()] = adapter_class
+        cls._cached_adapter.cache_clear()
+    
+    @classmethod
+    def get_transport_mode(cls, carrier: str, service_code: str) -> str:
+        """Resolve a carrier's transport mode without instantiating its adapter"""
+        return cls._adapter_class(carrier).get_transport_mode(service_code)
     
     @classmethod
     def list_supported_carriers(cls) -> List[str]:
@@ -1171,20 +1421,22 @@ class EmissionsCalculator:
         Returns:
             EmissionResult with detailed breakdown
         """
+        tonne_km_factors = EMISSION_FACTORS['tonne_km']
+        
         # Determine chargeable weight
         weight_kg = package_info.weight_kg
         is_dimensional = False
         
-        if package_info.dimensions:
+        if package_info.dimensions is not None:
             dim_weight = package_info.get_dimensional_weight_kg(package_info.carrier)
-            if dim_weight and dim_weight > weight_kg:
+            if dim_weight is not None and dim_weight > weight_kg:
                 weight_kg = dim_weight
                 is_dimensional = True
-                print(f"📦 Using dimensional weight: {weight_kg:.2f} kg")
+                logger.info("📦 Using dimensional weight: %.2f kg", weight_kg)
         
         # Check for address information
         if not package_info.origin or not package_info.destination:
-            print("⚠️ Missing address information")
+            logger.warning("⚠️ Missing address information")
             return None
         
         # Calculate distance
@@ -1195,40 +1447,27 @@ class EmissionsCalculator:
         )
         
         # Get transport mode
-        adapter = CarrierFactory.create_adapter(package_info.carrier.lower())
-        transport_mode = adapter.get_transport_mode(package_info.service_code or '')
+        transport_mode = CarrierFactory.get_transport_mode(
+            package_info.carrier, package_info.service_code or ''
+        )
         
         # Calculate main transit emissions
-        emission_factor = EMISSION_FACTORS['tonne_km'][transport_mode]
-        main_emissions = self.calculate_emissions(weight_kg, distance_km, transport_mode)
+        weight_tonnes = weight_kg / 1000
+        emission_factor = tonne_km_factors[transport_mode]
+        main_emissions = weight_tonnes * distance_km * emission_factor
         
-        breakdown = [{
-            'segment': 'Main Transit',
-            'mode': transport_mode,
-            'distance_km': distance_km,
-            'weight_kg': weight_kg,
-            'emission_factor': emission_factor,
-            'emissions_kg': main_emissions
-        }]
+        breakdown = [Segment('Main Transit', transport_mode, distance_km,
+                             weight_kg, emission_factor, main_emissions)]
         
         total_emissions = main_emissions
         
         # Add last-mile delivery if not already included
         if transport_mode != 'last_mile':
-            last_mile_distance = DEFAULT_DISTANCES['last_mile']
-            last_mile_emissions = self.calculate_emissions(
-                weight_kg, last_mile_distance, 'last_mile'
-            )
+            last_mile_emissions = weight_tonnes * _LAST_MILE_KM * _LAST_MILE_FACTOR
             total_emissions += last_mile_emissions
             
-            breakdown.append({
-                'segment': 'Last Mile Delivery',
-                'mode': 'last_mile',
-                'distance_km': last_mile_distance,
-                'weight_kg': weight_kg,
-                'emission_factor': EMISSION_FACTORS['tonne_km']['last_mile'],
-                'emissions_kg': last_mile_emissions
-            })
+            breakdown.append(Segment('Last Mile Delivery', 'last_mile', _LAST_MILE_KM,
+                                     weight_kg, _LAST_MILE_FACTOR, last_mile_emissions))
         
         return EmissionResult(
             total_emissions_kg=total_emissions,
@@ -1242,6 +1481,23 @@ class EmissionsCalculator:
         )
 
 
+_default_calculator: Optional[EmissionsCalculator] = None
+_default_calculator_lock = Lock()
+
+
+def get_default_calculator() -> EmissionsCalculator:
+    """
+    Shared EmissionsCalculator, created on first use.
+    Reusing it keeps the geocoder and its in-memory cache alive across calls.
+    """
+    global _default_calculator
+    if _default_calculator is None:
+        with _default_calculator_lock:
+            if _default_calculator is None:
+                _default_calculator = EmissionsCalculator()
+    return _default_calculator
+
+
 # ============================================================================
 # MAIN INTERFACE
 # ============================================================================
@@ -1280,8 +1536,8 @@ def print_emissions_report(result: EmissionResult):
     
     print(f"\nEmissions Breakdown:")
     for segment in result.breakdown:
-        print(f"  • {segment['segment']}: {segment['emissions_kg']:.4f} kg CO2e")
-        print(f"    ({segment['distance_km']:.0f} km @ {segment['emission_factor']:.3f} kg/tonne-km)")
+        print(f"  • {segment.segment}: {segment.emissions_kg:.4f} kg CO2e")
+        print(f"    ({segment.distance_km:.0f} km @ {segment.emission_factor:.3f} kg/tonne-km)")
     
     print(f"\n{'─'*70}")
     print(f"🌱 TOTAL EMISSIONS: {result.total_emissions_kg:.4f} kg CO2e")
@@ -1303,6 +1559,7 @@ def calculate_package_emissions(carrier: str, tracking_number: str,
                                credentials: Dict[str, str],
                                dimensions: Optional[Tuple[float, float, float]] = None,
                                verbose: bool = False,
+                               calculator: Optional[EmissionsCalculator] = None,
                                **adapter_kwargs) -> Optional[EmissionResult]:
     """
     Universal function to calculate emissions for any supported carrier.
@@ -1312,6 +1569,7 @@ def calculate_package_emissions(carrier: str, tracking_number: str,
         tracking_number: Package tracking number
         credentials: Authentication credentials (carrier-specific)
         dimensions: Optional package dimensions (L, W, H in cm)
+        calculator: EmissionsCalculator to use (default: shared instance)
         **adapter_kwargs: Additional carrier-specific arguments
     
     Returns:
@@ -1331,9 +1589,9 @@ def calculate_package_emissions(carrier: str, tracking_number: str,
     """
     # Create carrier adapter
     try:
-        adapter = CarrierFactory.create_adapter(carrier, **adapter_kwargs)
+        adapter = CarrierFactory.get_adapter(carrier, **adapter_kwargs)
     except ValueError as e:
-        print(f"❌ {e}")
+        logger.error("❌ %s", e)
         return None
     
     # Authentication
@@ -1343,6 +1601,11 @@ def calculate_package_emissions(carrier: str, tracking_number: str,
     
     # Fetch tracking data
     tracking_data = adapter.get_tracking_data(token, tracking_number)
+    if not tracking_data:
+        # A rejected token is dropped from the cache; retry once with a fresh one
+        fresh_token = adapter.authenticate(credentials)
+        if fresh_token and fresh_token != token:
+            tracking_data = adapter.get_tracking_data(fresh_token, tracking_number)
     if not tracking_data:
         return None
     
@@ -1356,7 +1619,8 @@ def calculate_package_emissions(carrier: str, tracking_number: str,
         package_info.dimensions = dimensions
     
     # Calculate emissions
-    calculator = EmissionsCalculator()
+    if calculator is None:
+        calculator = get_default_calculator()
     result = calculator.calculate_from_package_info(package_info)
     
     if not result:
@@ -1367,6 +1631,72 @@ def calculate_package_emissions(carrier: str, tracking_number: str,
         print_emissions_report(result)
     
     return result
+
+
+def calculate_many(packages: List[Tuple[str, str]],
+                   credentials: Dict[str, Dict[str, str]],
+                   max_workers: int = 10,
+                   **adapter_kwargs) -> List[Optional[EmissionResult]]:
+    """
+    Calculate emissions for many packages with their network calls overlapped.
+    
+    Args:
+        packages: List of (carrier, tracking_number) pairs
+        credentials: Dict of carrier name -> authentication credentials
+        max_workers: Number of concurrent requests (default: 10)
+        **adapter_kwargs: Additional carrier-specific arguments
+    
+    Returns:
+        List of EmissionResult (or None on failure) in the same order as packages
+    """
+    def calculate_one(package: Tuple[str, str]) -> Optional[EmissionResult]:
+        carrier, tracking_number = package
+        carrier_credentials = credentials.get(carrier.lower())
+        if carrier_credentials is None:
+            logger.error("❌ No credentials configured for %s", carrier)
+            return None
+        return calculate_package_emissions(carrier, tracking_number, carrier_credentials, **adapter_kwargs)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(calculate_one, packages))
+
+
+async def calculate_many_async(packages: List[Tuple[str, str]],
+                               credentials: Dict[str, Dict[str, str]],
+                               concurrency: int = 10,
+                               **adapter_kwargs) -> List[Optional[EmissionResult]]:
+    """
+    Async counterpart of calculate_many for callers already on an event loop.
+    
+    Each package runs in a worker thread (the adapters use the shared blocking
+    session), with at most `concurrency` in flight; tokens come from the shared
+    cache so the batch doesn't serialize on authentication.
+    
+    Args:
+        packages: List of (carrier, tracking_number) pairs
+        credentials: Dict of carrier name -> authentication credentials
+        concurrency: Maximum number of packages in flight (default: 10)
+        **adapter_kwargs: Additional carrier-specific arguments
+    
+    Returns:
+        List of EmissionResult (or None on failure) in the same order as packages
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def calculate_one(package: Tuple[str, str]) -> Optional[EmissionResult]:
+        carrier, tracking_number = package
+        carrier_credentials = credentials.get(carrier.lower())
+        if carrier_credentials is None:
+            logger.error("❌ No credentials configured for %s", carrier)
+            return None
+        async with semaphore:
+            return await asyncio.to_thread(
+                calculate_package_emissions, carrier, tracking_number, carrier_credentials, **adapter_kwargs
+            )
+    
+    return await asyncio.gather(*(calculate_one(package) for package in packages))
+
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
@@ -1376,15 +1706,34 @@ def get_supported_carriers() -> List[str]:
     return CarrierFactory.list_supported_carriers()
 
 
-def save_emissions_report(result: EmissionResult, filename: str = 'emissions_report.json'):
+def credentials_from_env(carrier: str) -> Dict[str, Optional[str]]:
     """
-    Save emissions calculation results to a JSON file.
+    Read a carrier's API credentials from the environment.
+    
+    Args:
+        carrier: Carrier name; reads <CARRIER>_CLIENT_ID and <CARRIER>_CLIENT_SECRET
+    
+    Returns:
+        Credentials dict (values are None when unset)
+    """
+    prefix = carrier.upper()
+    return {
+        'client_id': os.environ.get(f"{prefix}_CLIENT_ID"),
+        'client_secret': os.environ.get(f"{prefix}_CLIENT_SECRET")
+    }
+
+
+def build_emissions_report(result: EmissionResult) -> Dict[str, Any]:
+    """
+    Build the JSON-serializable report for an emissions calculation.
     
     Args:
         result: EmissionResult object
-        filename: Output filename
+        
+    Returns:
+        Report dict ready for orjson.dumps
     """
-    output = {
+    return {
         'tracking_number': result.package_info.tracking_number,
         'carrier': result.package_info.carrier,
         'service': result.package_info.service_description,
@@ -1394,17 +1743,27 @@ def save_emissions_report(result: EmissionResult, filename: str = 'emissions_rep
         'distance_km': result.distance_km,
         'transport_mode': result.transport_mode,
         'emission_factor': result.emission_factor,
-        'breakdown': result.breakdown,
-        'origin': result.package_info.origin.to_dict() if result.package_info.origin else None,
-        'destination': result.package_info.destination.to_dict() if result.package_info.destination else None,
+        'breakdown': [seg._asdict() for seg in result.breakdown],
+        # orjson serializes the Address dataclasses directly
+        'origin': result.package_info.origin,
+        'destination': result.package_info.destination,
         'environmental_equivalents': {
             'trees_to_offset_1_year': result.total_emissions_kg / 21,
             'miles_driven_equivalent': result.total_emissions_kg / 0.404
         }
     }
+
+
+def save_emissions_report(result: EmissionResult, filename: str = 'emissions_report.json'):
+    """
+    Save emissions calculation results to a JSON file.
     
-    with open(filename, 'w') as f:
-        json.dump(output, f, indent=2)
+    Args:
+        result: EmissionResult object
+        filename: Output filename
+    """
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(build_emissions_report(result), option=orjson.OPT_INDENT_2))
     
 
 
@@ -1413,74 +1772,48 @@ def save_emissions_report(result: EmissionResult, filename: str = 'emissions_rep
 # ============================================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("🌱 WPI Greenboard - Universal Emissions Calculator\n")
     print(f"Supported carriers: {', '.join(get_supported_carriers())}\n")
     
-    # Example 1: UPS Package
-    print("Example 1: UPS International Express")
-    print("-" * 70)
-    
-    ups_result = calculate_package_emissions(
-        carrier='ups',
-        tracking_number='1ZA81H440313373222',  # Your actual tracking number
-        credentials={
-           'client_id': 'HCTsyp8JsmGuiOYCkxpZAak9ZusNbA8Me9d1k5g7rmivxpoC',
-           'client_secret': 'bbUGGCg1q66AuEeGV66EjhcbG6GNtOGYTb1r5vqAxssUaBsovaQIKPiTWHHpAGZV'
-        },
-        production=False  # Use test environment
-    )
-    
-    if ups_result:
-        save_emissions_report(ups_result, 'ups_emissions_report.json')
-    
-    # Example 2: FedEx Package (uncomment when you have credentials)
-    print("\n\nExample 2: FedEx Ground")
-    print("-" * 70)
-    
-    # skapoor account number: 209908712
-    fedex_result = calculate_package_emissions(
-        carrier='fedex',
-        tracking_number='484078159554', # SK sample tracking number
-        credentials={
-            'client_id': 'l74673b0ec87d749268da2b0e59460429c',
-            'client_secret': '4e8527a4c6614ef386672eebeb086223'
-        },
-        production=False
-    )
-    
-    if fedex_result:
-        save_emissions_report(fedex_result, 'fedex_emissions_report.json')
-    
-    # Example 3: USPS Package (uncomment when you have credentials)
-    print("\n\nExample 3: USPS Priority Mail")
-    print("-" * 70)
-    
-    usps_result = calculate_package_emissions(
-        carrier='usps',
-        tracking_number='9234690390475000528723',
-        credentials={
-            'client_id': 'vrBISZnb8yn4KTNm0SA0UAA4yqlDfGdEFHkfARJzWgizAzGq',
-            'client_secret': '13b8Ius4epIhNbIlz2s9KIlAOT0JVkSqnBGjtD6q5rnW5TRHrchLZYBfwUAaM51Y'
+    # (carrier, description, tracking number, production); credentials come
+    # from <CARRIER>_CLIENT_ID / <CARRIER>_CLIENT_SECRET
+    examples = [
+        ('ups', "UPS International Express", '1ZA81H440313373222', False),
+        # skapoor account number: 209908712
+        ('fedex', "FedEx Ground", '484078159554', False),
+        ('usps', "USPS Priority Mail", '9234690390475000528723', False),
+        ('dhl', "DHL Express Worldwide", '2662115901', True),
+    ]
+    credentials = {carrier: credentials_from_env(carrier) for carrier, *_ in examples}
+    for carrier, creds in credentials.items():
+        if not creds['client_id'] or not creds['client_secret']:
+            print(f"⚠️  {carrier.upper()}_CLIENT_ID / {carrier.upper()}_CLIENT_SECRET not set")
+    
+    # Carrier round-trips are network bound, so run all examples at once
+    reports = {}
+    with ThreadPoolExecutor(max_workers=len(examples)) as executor:
+        futures = {
+            executor.submit(
+                calculate_package_emissions,
+                carrier=carrier,
+                tracking_number=tracking_number,
+                credentials=credentials[carrier],
+                production=production
+            ): (carrier, description)
+            for carrier, description, tracking_number, production in examples
         }
-    )
-    
-    if usps_result:
-        save_emissions_report(usps_result, 'usps_emissions_report.json')
-    
-    # Example 4: DHL Package (uncomment when you have credentials)
-    print("\n\nExample 4: DHL Express Worldwide")
-    print("-" * 70)
-    
-    dhl_result = calculate_package_emissions(
-        carrier='dhl',
-        tracking_number='2662115901',
-        credentials={
-            'client_id': 'JLOAsRhxyRDiU4hyT1w4ueexJlqSMVqg',
-            'client_secret': 'cMI8ojXzljz32GhE'
-        },
-        production=True
-    )
-    print(dhl_result)
-    # 
-    # if dhl_result:
-    #     save_emissions_report(dhl_result, 'dhl_emissions_report.json')
\ No newline at end of file
+        
+        for future in as_completed(futures):
+            carrier, description = futures[future]
+            result = future.result()
+            print(f"\n{description}: {'✓' if result else '❌ failed'}")
+            print("-" * 70)
+            if result:
+                print_emissions_report(result)
+                reports[carrier] = build_emissions_report(result)
+    
+    # One file for the whole run instead of a write per carrier
+    with open('emissions_reports.json', 'wb') as f:
+        f.write(orjson.dumps(reports, option=orjson.OPT_INDENT_2))
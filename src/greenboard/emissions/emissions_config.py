@@ -13,52 +13,55 @@ Sources:
 - European Environment Agency (EEA)
 """
 
-from typing import Dict, Optional
-from enum import Enum
+from typing import Dict, Optional, Tuple
+from enum import IntEnum
+from functools import lru_cache
+
+import numpy as np
 
 
 # ============================================================================
 # STANDARDIZED SERVICE TYPES
 # ============================================================================
 
-class ServiceType(Enum):
-    """Standardized service types across all carriers"""
+class ServiceType(IntEnum):
+    """Standardized service types across all carriers; values are dense ordinals for array indexing"""
     
     # Ground Services
-    GROUND_STANDARD = "ground_standard"           # Standard ground, 5-7 days
-    GROUND_ECONOMY = "ground_economy"             # Economy ground, 7+ days
-    GROUND_EXPEDITED = "ground_expedited"         # Expedited ground, 3-4 days
-    GROUND_2DAY = "ground_2day"                   # 2-day ground service
+    GROUND_STANDARD = 0               # Standard ground, 5-7 days
+    GROUND_ECONOMY = 1                # Economy ground, 7+ days
+    GROUND_EXPEDITED = 2              # Expedited ground, 3-4 days
+    GROUND_2DAY = 3                   # 2-day ground service
     
     # Air Services - Domestic
-    AIR_NEXT_DAY = "air_next_day"                 # Next day air
-    AIR_NEXT_DAY_EARLY = "air_next_day_early"     # Next day air early AM
-    AIR_NEXT_DAY_SAVER = "air_next_day_saver"     # Next day air saver
-    AIR_2DAY = "air_2day"                         # 2nd day air
-    AIR_2DAY_EARLY = "air_2day_early"             # 2nd day air AM
-    AIR_3DAY = "air_3day"                         # 3 day select
+    AIR_NEXT_DAY = 4                  # Next day air
+    AIR_NEXT_DAY_EARLY = 5            # Next day air early AM
+    AIR_NEXT_DAY_SAVER = 6            # Next day air saver
+    AIR_2DAY = 7                      # 2nd day air
+    AIR_2DAY_EARLY = 8                # 2nd day air AM
+    AIR_3DAY = 9                      # 3 day select
     
     # Air Services - International
-    AIR_INTERNATIONAL_EXPRESS = "air_intl_express"     # Worldwide express
-    AIR_INTERNATIONAL_EXPEDITED = "air_intl_expedited" # Worldwide expedited
-    AIR_INTERNATIONAL_SAVER = "air_intl_saver"         # International saver
+    AIR_INTERNATIONAL_EXPRESS = 10    # Worldwide express
+    AIR_INTERNATIONAL_EXPEDITED = 11  # Worldwide expedited
+    AIR_INTERNATIONAL_SAVER = 12      # International saver
     
     # Ocean/Maritime
-    OCEAN_STANDARD = "ocean_standard"             # Standard ocean freight
-    OCEAN_EXPEDITED = "ocean_expedited"           # Expedited ocean freight
+    OCEAN_STANDARD = 13               # Standard ocean freight
+    OCEAN_EXPEDITED = 14              # Expedited ocean freight
     
     # Rail
-    RAIL_STANDARD = "rail_standard"               # Standard rail freight
+    RAIL_STANDARD = 15                # Standard rail freight
     
     # Last Mile
-    LAST_MILE_STANDARD = "last_mile_standard"     # Standard last mile delivery
-    LAST_MILE_URBAN = "last_mile_urban"           # Urban last mile (more stops)
+    LAST_MILE_STANDARD = 16           # Standard last mile delivery
+    LAST_MILE_URBAN = 17              # Urban last mile (more stops)
     
     # Specialized
-    FREIGHT_LTL = "freight_ltl"                   # Less than truckload freight
-    FREIGHT_FTL = "freight_ftl"                   # Full truckload freight
-    MAIL_INNOVATIONS = "mail_innovations"         # Hybrid carrier/postal
-    SUREPOST = "surepost"                         # UPS SurePost (hybrid)
+    FREIGHT_LTL = 18                  # Less than truckload freight
+    FREIGHT_FTL = 19                  # Full truckload freight
+    MAIL_INNOVATIONS = 20             # Hybrid carrier/postal
+    SUREPOST = 21                     # UPS SurePost (hybrid)
 
 
 # ============================================================================
@@ -109,10 +112,87 @@ EMISSION_FACTORS = {
 }
 
 
+# ============================================================================
+# BULK EMISSIONS KERNELS
+# ============================================================================
+
+def calculate_emissions_vec(weight_kg: np.ndarray, distance_km: np.ndarray,
+                            factors: np.ndarray) -> np.ndarray:
+    """
+    Emissions for many packages in one pass, equivalent to
+    weight_kg / 1000 * distance_km * factor per package.
+    
+    Args:
+        weight_kg: Package weights in kilograms
+        distance_km: Distances in kilometers
+        factors: Emission factors in kg CO2e per tonne-km
+        
+    Returns:
+        Array of emissions in kg CO2e
+    """
+    # One output buffer, updated in place, instead of a temporary per operator
+    emissions = np.multiply(weight_kg, distance_km, dtype=np.float64)
+    emissions *= factors
+    emissions /= 1000
+    return emissions
+
+
+def compute_full_emissions(weight_kg: np.ndarray, distance_main_km: np.ndarray,
+                           distance_last_km: np.ndarray, factor_main: np.ndarray,
+                           factor_last: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Main-transit, last-mile and total emissions for many packages together.
+    
+    Args:
+        weight_kg: Package weights in kilograms
+        distance_main_km: Main-transit distances in kilometers
+        distance_last_km: Last-mile distances in kilometers (0 where there is no last-mile leg)
+        factor_main: Main-transit emission factors in kg CO2e per tonne-km
+        factor_last: Last-mile emission factors in kg CO2e per tonne-km
+        
+    Returns:
+        Tuple of (main, last_mile, total) arrays in kg CO2e
+    """
+    main = calculate_emissions_vec(weight_kg, distance_main_km, factor_main)
+    last = calculate_emissions_vec(weight_kg, distance_last_km, factor_last)
+    return main, last, main + last
+
+
 # ============================================================================
 # CARRIER SERVICE CODE MAPPINGS
 # ============================================================================
 
+def _make_service_lookup(service_map: Dict[str, ServiceType], upper: bool):
+    """Build a service-code lookup specialised for one carrier's map and case policy"""
+    get = service_map.get
+    default = ServiceType.GROUND_STANDARD
+    if upper:
+        return lambda service_code: get(service_code.upper(), default)
+    return lambda service_code: get(service_code, default)
+
+
+def _default_service_lookup(service_code: str) -> ServiceType:
+    return ServiceType.GROUND_STANDARD
+
+
+# Small integer tag per carrier; unknown carriers map to -1
+CARRIER_IDS = {'ups': 0, 'fedex': 1, 'usps': 2, 'dhl': 3}
+
+
+@lru_cache(maxsize=16)
+def carrier_id(name: str) -> int:
+    """
+    Normalise a carrier name to its integer tag, once per distinct name.
+    
+    Args:
+        name: Carrier name in any case, e.g. 'UPS' or ' fedex '
+        
+    Returns:
+        Index into CARRIER_IDS order, or -1 for an unknown carrier
+    """
+    return CARRIER_IDS.get(name.lower().strip(), -1)
+
+
 class CarrierServiceMapper:
     """Maps carrier-specific service codes to standardized ServiceType"""
     
@@ -183,6 +263,17 @@ class CarrierServiceMapper:
         'GROUND': ServiceType.GROUND_STANDARD,
     }
     
+    # carrier_id -> specialised lookup; UPS codes are numeric/mixed literals
+    # and are matched as given, the others are upper-cased first. The trailing
+    # default is what carrier_id's -1 for unknown carriers indexes.
+    _SERVICE_LOOKUPS = (
+        _make_service_lookup(UPS_SERVICE_MAP, upper=False),
+        _make_service_lookup(FEDEX_SERVICE_MAP, upper=True),
+        _make_service_lookup(USPS_SERVICE_MAP, upper=True),
+        _make_service_lookup(DHL_SERVICE_MAP, upper=True),
+        _default_service_lookup,
+    )
+    
     @classmethod
     def get_service_type(cls, carrier: str, service_code: str) -> ServiceType:
         """
@@ -195,19 +286,7 @@ class CarrierServiceMapper:
         Returns:
             StandardizedServiceType enum value
         """
-        carrier_lower = carrier.lower().strip()
-        service_code_upper = service_code.upper().strip()
-        
-        if carrier_lower == 'ups':
-            return cls.UPS_SERVICE_MAP.get(service_code, ServiceType.GROUND_STANDARD)
-        elif carrier_lower == 'fedex':
-            return cls.FEDEX_SERVICE_MAP.get(service_code_upper, ServiceType.GROUND_STANDARD)
-        elif carrier_lower == 'usps':
-            return cls.USPS_SERVICE_MAP.get(service_code_upper, ServiceType.GROUND_STANDARD)
-        elif carrier_lower == 'dhl':
-            return cls.DHL_SERVICE_MAP.get(service_code_upper, ServiceType.GROUND_STANDARD)
-        else:
-            return ServiceType.GROUND_STANDARD
+        return cls._SERVICE_LOOKUPS[carrier_id(carrier)](service_code)
     
     @classmethod
     def get_emission_factor(cls, carrier: str, service_code: str) -> float:
@@ -241,61 +320,75 @@ DEFAULT_DISTANCES = {
 # HELPER FUNCTIONS
 # ============================================================================
 
+# Descriptions indexed by ServiceType ordinal
+_DESCRIPTIONS = (
+    "Standard Ground Shipping",     # GROUND_STANDARD
+    "Economy Ground Shipping",      # GROUND_ECONOMY
+    "Expedited Ground Shipping",    # GROUND_EXPEDITED
+    "2-Day Ground Shipping",        # GROUND_2DAY
+    "Next Day Air",                 # AIR_NEXT_DAY
+    "Next Day Air Early AM",        # AIR_NEXT_DAY_EARLY
+    "Next Day Air Saver",           # AIR_NEXT_DAY_SAVER
+    "2nd Day Air",                  # AIR_2DAY
+    "2nd Day Air Early AM",         # AIR_2DAY_EARLY
+    "3 Day Select",                 # AIR_3DAY
+    "International Express",        # AIR_INTERNATIONAL_EXPRESS
+    "International Expedited",      # AIR_INTERNATIONAL_EXPEDITED
+    "International Saver",          # AIR_INTERNATIONAL_SAVER
+    "Standard Ocean Freight",       # OCEAN_STANDARD
+    "Expedited Ocean Freight",      # OCEAN_EXPEDITED
+    "Rail Freight",                 # RAIL_STANDARD
+    "Last Mile Delivery",           # LAST_MILE_STANDARD
+    "Urban Last Mile Delivery",     # LAST_MILE_URBAN
+    "Less Than Truckload Freight",  # FREIGHT_LTL
+    "Full Truckload Freight",       # FREIGHT_FTL
+    "Mail Innovations",             # MAIL_INNOVATIONS
+    "SurePost",                     # SUREPOST
+)
+
+
+def _is_service_ordinal(service_type) -> bool:
+    """True for a ServiceType (or plain int) that indexes the lookup tables below"""
+    return isinstance(service_type, int) and 0 <= service_type < len(ServiceType)
+
+
 def get_service_description(service_type: ServiceType) -> str:
     """Get human-readable description of service type"""
-    descriptions = {
-        ServiceType.GROUND_STANDARD: "Standard Ground Shipping",
-        ServiceType.GROUND_ECONOMY: "Economy Ground Shipping",
-        ServiceType.GROUND_EXPEDITED: "Expedited Ground Shipping",
-        ServiceType.GROUND_2DAY: "2-Day Ground Shipping",
-        ServiceType.AIR_NEXT_DAY: "Next Day Air",
-        ServiceType.AIR_NEXT_DAY_EARLY: "Next Day Air Early AM",
-        ServiceType.AIR_NEXT_DAY_SAVER: "Next Day Air Saver",
-        ServiceType.AIR_2DAY: "2nd Day Air",
-        ServiceType.AIR_2DAY_EARLY: "2nd Day Air Early AM",
-        ServiceType.AIR_3DAY: "3 Day Select",
-        ServiceType.AIR_INTERNATIONAL_EXPRESS: "International Express",
-        ServiceType.AIR_INTERNATIONAL_EXPEDITED: "International Expedited",
-        ServiceType.AIR_INTERNATIONAL_SAVER: "International Saver",
-        ServiceType.OCEAN_STANDARD: "Standard Ocean Freight",
-        ServiceType.OCEAN_EXPEDITED: "Expedited Ocean Freight",
-        ServiceType.RAIL_STANDARD: "Rail Freight",
-        ServiceType.LAST_MILE_STANDARD: "Last Mile Delivery",
-        ServiceType.LAST_MILE_URBAN: "Urban Last Mile Delivery",
-        ServiceType.FREIGHT_LTL: "Less Than Truckload Freight",
-        ServiceType.FREIGHT_FTL: "Full Truckload Freight",
-        ServiceType.MAIL_INNOVATIONS: "Mail Innovations",
-        ServiceType.SUREPOST: "SurePost",
-    }
-    return descriptions.get(service_type, "Standard Shipping")
+    if _is_service_ordinal(service_type):
+        return _DESCRIPTIONS[service_type]
+    return "Standard Shipping"
+
+
+# Bit i is set when ServiceType(i) belongs to the group
+_AIR_MASK = sum(1 << service_type for service_type in (
+    ServiceType.AIR_NEXT_DAY,
+    ServiceType.AIR_NEXT_DAY_EARLY,
+    ServiceType.AIR_NEXT_DAY_SAVER,
+    ServiceType.AIR_2DAY,
+    ServiceType.AIR_2DAY_EARLY,
+    ServiceType.AIR_3DAY,
+    ServiceType.AIR_INTERNATIONAL_EXPRESS,
+    ServiceType.AIR_INTERNATIONAL_EXPEDITED,
+    ServiceType.AIR_INTERNATIONAL_SAVER,
+))
+
+_INTL_MASK = sum(1 << service_type for service_type in (
+    ServiceType.AIR_INTERNATIONAL_EXPRESS,
+    ServiceType.AIR_INTERNATIONAL_EXPEDITED,
+    ServiceType.AIR_INTERNATIONAL_SAVER,
+    ServiceType.OCEAN_STANDARD,
+    ServiceType.OCEAN_EXPEDITED,
+))
 
 
 def is_air_service(service_type: ServiceType) -> bool:
     """Check if service type is air-based"""
-    air_services = {
-        ServiceType.AIR_NEXT_DAY,
-        ServiceType.AIR_NEXT_DAY_EARLY,
-        ServiceType.AIR_NEXT_DAY_SAVER,
-        ServiceType.AIR_2DAY,
-        ServiceType.AIR_2DAY_EARLY,
-        ServiceType.AIR_3DAY,
-        ServiceType.AIR_INTERNATIONAL_EXPRESS,
-        ServiceType.AIR_INTERNATIONAL_EXPEDITED,
-        ServiceType.AIR_INTERNATIONAL_SAVER,
-    }
-    return service_type in air_services
+    return _is_service_ordinal(service_type) and bool(_AIR_MASK >> service_type & 1)
 
 
 def is_international(service_type: ServiceType) -> bool:
     """Check if service type is international"""
-    intl_services = {
-        ServiceType.AIR_INTERNATIONAL_EXPRESS,
-        ServiceType.AIR_INTERNATIONAL_EXPEDITED,
-        ServiceType.AIR_INTERNATIONAL_SAVER,
-        ServiceType.OCEAN_STANDARD,
-        ServiceType.OCEAN_EXPEDITED,
-    }
-    return service_type in intl_services
+    return _is_service_ordinal(service_type) and bool(_INTL_MASK >> service_type & 1)
 
 
 def get_default_distance(service_type: ServiceType) -> float:
@@ -316,7 +409,7 @@ if __name__ == "__main__":
     # Example: Get emission factor for UPS Ground
     service_type = CarrierServiceMapper.get_service_type('ups', '03')
     emission_factor = EMISSION_FACTORS[service_type]
-    print(f"UPS Ground (03): {service_type.value}")
+    print(f"UPS Ground (03): {service_type.name}")
     print(f"Emission Factor: {emission_factor} kg CO2e/tonne-km")
     print(f"Description: {get_service_description(service_type)}")
     
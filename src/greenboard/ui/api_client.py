@@ -0,0 +1,86 @@
+import streamlit as st
+import pandas as pd
+import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import os
+
+# API configuration
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+
+# One pooled keep-alive session for every page. Imported modules outlive
+# Streamlit reruns, so connections to the API are reused across them.
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+# requests already asks for gzip by default; make it explicit since the API
+# compresses its larger JSON responses
+_session.headers.update({"Accept-Encoding": "gzip", "Accept": "application/json"})
+
+
+def fetch_json(path: str, params: tuple = (), timeout: float = 8):
+    """
+    GET an API path and decode the JSON body.
+
+    Args:
+        path: API path, e.g. "/leaderboard/students/"
+        params: Query parameters as (key, value) pairs
+        timeout: Request timeout in seconds
+
+    Returns:
+        Decoded JSON response
+
+    Raises:
+        requests.exceptions.RequestException on connection, HTTP or decode errors
+    """
+    response = _session.get(f"{API_BASE_URL}{path}", params=dict(params), timeout=timeout)
+    response.raise_for_status()
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        # Same exception response.json() raises, so pages' RequestException handlers still apply
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+
+
+def to_frame(data) -> pd.DataFrame:
+    """
+    Build a DataFrame from decoded JSON rows using Arrow-backed dtypes.
+
+    Strings and nullable numbers become pyarrow columns instead of object
+    dtype, which are lighter to sort/filter and are what Streamlit sends to
+    the frontend anyway.
+
+    Args:
+        data: List of row dicts (or anything pd.DataFrame accepts)
+
+    Returns:
+        DataFrame with pyarrow dtypes
+    """
+    return pd.DataFrame(data).convert_dtypes(dtype_backend="pyarrow")
+
+
+# Cached variants keyed on (path, params); params must be a tuple of pairs so
+# Streamlit can hash them. TTLs follow how often each kind of data changes.
+
+@st.cache_data(ttl=5, show_spinner=False)
+def get_live_json(path: str, params: tuple = ()):
+    """Fast-moving data such as /timeline/*"""
+    return fetch_json(path, params)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_json(path: str, params: tuple = ()):
+    """Default cache for per-student and leaderboard data"""
+    return fetch_json(path, params)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_static_json(path: str, params: tuple = ()):
+    """Slow-moving data such as /db/tables and /leaderboard/majors/"""
+    return fetch_json(path, params)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+# Most points worth sending to a browser chart; beyond this they overlap
+MAX_CHART_POINTS = 2000
+
+
+def downsample(df: pd.DataFrame, column: str, n_out: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Thin an ordered series for charting while keeping its peaks and troughs.
+
+    Rows are split into (n_out - 2) // 2 equal buckets and the minimum and maximum
+    row of each bucket is kept (plus the first and last row), so spikes
+    survive even when most points are dropped.
+
+    Args:
+        df: Rows in plotting order
+        column: Numeric column whose shape should be preserved
+        n_out: Upper bound on the number of rows returned
+
+    Returns:
+        df unchanged if it is already small enough, otherwise a subset of its rows
+    """
+    n = len(df)
+    if n <= n_out:
+        return df
+
+    values = df[column].to_numpy(dtype=np.float64, na_value=0)
+    edges = np.linspace(0, n, (n_out - 2) // 2 + 1, dtype=np.int64)
+
+    keep = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = values[start:end]
+        keep.append(start + bucket.argmin())
+        keep.append(start + bucket.argmax())
+
+    return df.iloc[np.unique(keep)]
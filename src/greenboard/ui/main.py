@@ -1,9 +1,7 @@
 import streamlit as st
 import requests
-import os
 
-# API configuration
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+from api_client import get_json, get_static_json
 
 st.set_page_config(
     page_title="WPI Greenboard",
@@ -14,23 +12,21 @@ st.title("WPI Greenboard")
 
 # Health check
 try:
-    health_response = requests.get(f"{API_BASE_URL}/db/health")
-    if health_response.status_code == 200:
-        health_data = health_response.json()
-        st.success("✅ Connected to API")
-        st.write("Database time:", health_data["database_time"])
-    else:
-        st.error("❌ API connection failed")
+    health_data = get_json("/db/health")
+    st.success("✅ Connected to API")
+    st.write("Database time:", health_data["database_time"])
+except requests.exceptions.HTTPError:
+    st.error("❌ API connection failed")
 except requests.exceptions.RequestException:
     st.error("❌ Cannot connect to API")
 
 # Display tables
 try:
-    tables_response = requests.get(f"{API_BASE_URL}/db/tables")
-    if tables_response.status_code == 200:
-        tables_data = tables_response.json()
-        st.write("Tables in the database:")
-        for table in tables_data["tables"]:
-            st.write("-", table)
+    tables_data = get_static_json("/db/tables")
+    st.write("Tables in the database:")
+    for table in tables_data["tables"]:
+        st.write("-", table)
+except requests.exceptions.HTTPError:
+    pass
 except requests.exceptions.RequestException:
-    st.error("Failed to fetch tables")
\ No newline at end of file
+    st.error("Failed to fetch tables")
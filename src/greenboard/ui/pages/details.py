@@ -1,18 +1,82 @@
+import re
 import streamlit as st
 import pandas as pd
 import requests
-import os
+from concurrent.futures import ThreadPoolExecutor
 
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+from api_client import fetch_json, to_frame
+from charts import downsample
 
 st.set_page_config(page_title="Details", page_icon="📦")
 
-selected_student = st.session_state.get("selected_student", None)
+# persons.wpi_id is CHAR(9): zero-padded digits
+WPI_ID_RE = re.compile(r"[0-9]{9}")
+
+# Characters that would otherwise be read as markdown in a heading
+_MARKDOWN_SPECIAL_RE = re.compile(r"([\\`*_{}\[\]()#+\-.!|<>~$])")
+
+
+def escape_markdown(value) -> str:
+    """Render a user-supplied string literally inside st.markdown"""
+    return _MARKDOWN_SPECIAL_RE.sub(r"\\\1", str(value))
+
+
+def packages_frame(packages) -> pd.DataFrame:
+    """Student's packages with parsed dates, newest first"""
+    df = to_frame(packages)
+    if not df.empty:
+        df['date_shipped'] = pd.to_datetime(df['date_shipped'])
+        # Display strings for the whole column at once; NaT/NA fall back cleanly
+        df['date_str'] = df['date_shipped'].dt.strftime('%B %d, %Y').fillna("Unknown Date")
+        df['emissions_fmt'] = df['total_emissions_kg'].map("{:.2f} kg CO2e".format, na_action="ignore")
+        df = df.sort_values('date_shipped', ascending=False).reset_index(drop=True)
+    return df
+
+
+def timeline_frame(timeline_data) -> pd.DataFrame:
+    """Student's daily package counts without empty periods"""
+    if "timeline" not in timeline_data:
+        return pd.DataFrame()
+    timeline_df = to_frame(timeline_data["timeline"])
+
+    # Skip any where the period is null or empty
+    if "period" in timeline_df.columns:
+        timeline_df = timeline_df[timeline_df["period"].notnull() & (timeline_df["period"].astype(str) != "None")]
+    return timeline_df
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_student(wpi_id) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Packages and timeline for a student, fetched concurrently and cached across reruns"""
+    # The two endpoints are independent, so wait for the slower one rather than both
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        packages = executor.submit(fetch_json, f"/packages/student/{wpi_id}")
+        timeline = executor.submit(fetch_json, f"/timeline/person/{wpi_id}", (("interval", "day"),))
+        return packages_frame(packages.result()), timeline_frame(timeline.result())
+
+
+# The leaderboard links here with ?wpi_id=...&name=...; fall back to a
+# selection stored in session state
+if "wpi_id" in st.query_params:
+    selected_student = {
+        "wpi_id": st.query_params["wpi_id"],
+        "name": st.query_params.get("name", "Student Details"),
+    }
+else:
+    selected_student = st.session_state.get("selected_student", None)
+
+# wpi_id ends up in API paths, so anything that isn't a real ID stops here
+invalid_student = selected_student is not None and not WPI_ID_RE.fullmatch(str(selected_student.get("wpi_id", "")))
+if invalid_student:
+    selected_student = None
 
 if selected_student:
-    st.markdown(f"# {selected_student['name']}")
+    st.markdown(f"# {escape_markdown(selected_student['name'])}")
     if 'major' in selected_student and selected_student['major'] is not None:
-        st.markdown(f"### {selected_student['major']} Major")
+        st.markdown(f"### {escape_markdown(selected_student['major'])} Major")
+elif invalid_student:
+    st.markdown("# Student Details")
+    st.markdown("### Student not found")
 else:
     st.markdown("# Student Details")
     st.markdown("### No student selected")
@@ -30,100 +94,107 @@ else:
 
 try:
     if selected_student and "wpi_id" in selected_student:
-        df = pd.DataFrame(requests.get(f"{API_BASE_URL}/packages/student/{selected_student['wpi_id']}").json())
-        timeline_data = requests.get(f"{API_BASE_URL}/timeline/person/{selected_student['wpi_id']}?interval=day").json()
+        df, timeline_df = load_student(selected_student['wpi_id'])
     else:
         df = pd.DataFrame()
-        timeline_data = None
+        timeline_df = pd.DataFrame()
 except requests.exceptions.RequestException:
     st.error("❌ Cannot connect to API")
     df = pd.DataFrame()
 
-# Assign emissions constants based on transport mode, carrier, and weight
-transit_emission_factors = {
-    "Air": 2.0,    # kg CO2 per lb
-    "Ground": 1.0, # kg CO2 per lb
-    "Ship": 0.5    # kg CO2 per lb
-}
-
-weight_emission_factors = {
-    (0, 2): 1.0,     # 0 < weight ≤ 2 lbs
-    (2, 5): 1.5,     # 2 < weight ≤ 5 lbs
-    (5, 10): 2.0,    # 5 < weight ≤ 10 lbs
-    (10, float('inf')): 2.5  # weight > 10 lbs
-}
-
 
 if not df.empty:
     # Show a timeline view of each package, where each has a card with its details, including a formula showing how the carbon emissions were calculated
     st.markdown("## Package Delivery Timeline")
 
-    if timeline_data is not None and "timeline" in timeline_data:
-        timeline_df = pd.DataFrame(timeline_data["timeline"])
-
-        # Skip any where the period is null or empty
-        if "period" in timeline_df.columns:
-            timeline_df = timeline_df[timeline_df["period"].notnull() & (timeline_df["period"].astype(str) != "None")]
-
-        if timeline_df.shape[0] > 1:
-            # Plot the timeline of emissions over time
-            st.area_chart(timeline_df.set_index('period')['package_count'], height=300, width=700, x_label="Period", y_label="Number of Packages", use_container_width=True)
-
-
-    # Convert dates to datetime for proper sorting
-    df['date_shipped'] = pd.to_datetime(df['date_shipped'])
-    df_sorted = df.sort_values('date_shipped', ascending=False)
-
-    i = 0
-
-    for index, row in df_sorted.iterrows():            
-        # Skip entries with missing data
-        if pd.isnull(row['total_emissions_kg']):
-            continue
-
-        try:
-            date_shipped = row['date_shipped'].strftime('%B %d, %Y')
-        except Exception:
-            date_shipped = "Unknown Date"
-
-        i += 1
+    if timeline_df.shape[0] > 1:
+        # Plot the timeline of emissions over time
+        st.area_chart(downsample(timeline_df, 'package_count').set_index('period')['package_count'], height=300, width=700, x_label="Period", y_label="Number of Packages", use_container_width=True)
+
+
+    # Already sorted and formatted by load_student; one null mask both drops
+    # unusable rows and counts them for the warning below
+    missing_mask = df['total_emissions_kg'].isnull()
+    missing_data_count = int(missing_mask.sum())
+    df_sorted = df.loc[~missing_mask].reset_index(drop=True)
+
+    # Pagination so only one page of packages is sent per rerun
+    page_size = 20
+    total_packages = len(df_sorted)
+    total_pages = max((total_packages - 1) // page_size + 1, 1)
+
+    # Get current page from session state or default to 1, clamped in case
+    # a previous student had more pages
+    page = min(st.session_state.get('details_page', 1), total_pages)
+    start_idx = (page - 1) * page_size
+    end_idx = start_idx + page_size
+    df_page = df_sorted.iloc[start_idx:end_idx]
+
+    if total_pages > 1:
+        st.write(f"Showing packages {start_idx + 1}-{min(end_idx, total_packages)} of {total_packages}")
+
+    # One table for the page instead of a card per row
+    st.dataframe(
+        df_page[['date_shipped', 'carrier_name', 'service_type', 'distance_traveled', 'total_emissions_kg']],
+        column_config={
+            'date_shipped': st.column_config.DateColumn("Delivered", format="MMMM D, YYYY"),
+            'carrier_name': "Carrier",
+            'service_type': "Transport Mode",
+            'distance_traveled': "Distance",
+            'total_emissions_kg': st.column_config.NumberColumn("Carbon Emissions", format="%.2f kg CO2e"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    # Page selector below the table
+    if total_pages > 1:
+        col1, col2, col3, col4, col5 = st.columns([1, 2, 3, 2, 1])
+
+        with col2:
+            if st.button("← Previous", disabled=(page <= 1), key="details_prev", use_container_width=True):
+                st.session_state.details_page = page - 1
+                st.rerun()
+
+        with col3:
+            new_page = st.selectbox("Page", range(1, total_pages + 1), index=page-1, key="details_page_selector", label_visibility="collapsed")
+            if new_page != page:
+                st.session_state.details_page = new_page
+                st.rerun()
+
+        with col4:
+            if st.button("Next →", disabled=(page >= total_pages), key="details_next", use_container_width=True):
+                st.session_state.details_page = page + 1
+                st.rerun()
+
+    if not df_page.empty:
+        # Full card only for the package the user picks
+        selected = st.selectbox(
+            "Package details",
+            df_page.index,
+            format_func=lambda i: f"📦 Package {i + 1} — {df_sorted.at[i, 'tracking_number']}",
+        )
+        row = next(df_sorted.iloc[[selected]].itertuples(index=False))
 
         # Card container with border styling
         with st.container(border=True):
             # Header with date and package number prominently displayed
-            st.markdown(f"### 📦 Package {i}")
-            st.caption(f"Delivered on {date_shipped}")
+            st.markdown(f"### 📦 Package {selected + 1}")
+            st.caption(f"Delivered on {row.date_str}")
             
             # Package details in a clean layout
             col_details1, col_details2 = st.columns(2)
             
             with col_details1:
-                # st.markdown(f"**Distance:** {row['distance_traveled']} km")
-                st.metric("Distance", row['distance_traveled'])
-                # st.metric("Weight", f"{row['Weight (lbs)']} lbs")
-                st.metric("Carrier", row['carrier_name'])
+                st.metric("Distance", row.distance_traveled)
+                st.metric("Carrier", row.carrier_name)
             
             with col_details2:
-                # st.write(row)
-                st.metric("Transport Mode", row['service_type'])
-                st.metric("Carbon Emissions", f"{row['total_emissions_kg']:.2f} kg CO2e")
-
-            # with st.expander("📍 View Route Details", expanded=False):
-                # st.markdown(f"**Source:** {row['Source']}")
-                # st.markdown(f"**Destination:** {row['Desitination']}")
-                # st.markdown(f"**Distance:** {row['distance_traveled']} km")
-
-            # with st.expander("🚛 Emission Breakdown", expanded=False):
-            #     st.markdown(f"**Main Transit Emissions:** {row['Main Transit Emissions (kg CO2e)']:.4f} kg CO2e")
-            #     st.markdown(f"**Last Mile Emissions:** {row['Last Mile Emissions (kg CO2e)']:.4f} kg CO2e")
-
-            # with st.expander("🌳 Environmental Impact", expanded=False):
-            #     st.markdown(f"**Trees Needed (1 year):** {row['Tree needed (1 year)']:.2f}")
-            #     st.markdown(f"**Equivalent Miles Driven:** {row['Equivalent miles driven']:.2f} miles")
+                st.metric("Transport Mode", row.service_type)
+                st.metric("Carbon Emissions", row.emissions_fmt)
 
         st.markdown("<br>", unsafe_allow_html=True)
 
     # Add an alert at the bottom indicating the number of packages that weren't shown due to missing data
-    missing_data_count = df['total_emissions_kg'].isnull().sum()
     if missing_data_count > 0:
         st.warning(f"⚠️ {missing_data_count} packages were not shown due to missing emissions data.")
\ No newline at end of file
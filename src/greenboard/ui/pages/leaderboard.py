@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
 import requests
-import os
 
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+from api_client import fetch_json, get_json, get_static_json, to_frame
 
 st.markdown("# 🌱 WPI Greenboard")
 st.markdown("2025-2026 Academic Year")
@@ -20,32 +19,30 @@ group_by_major = (view_mode == "By Major")
 entries_options = [5, 10, 15, 20, 25]
 num_entries = st.sidebar.selectbox("Entries per page", entries_options, index=1)  # Default to 10
 
-# Display the leaderboard
-if group_by_major:
-    st.subheader("Emissions by Major (Oct 2025)")
 
-    try:
-        major_stats = pd.DataFrame(requests.get(f"{API_BASE_URL}/leaderboard/majors/").json()) 
-    except requests.exceptions.RequestException:
-        st.error("❌ Cannot connect to API")
-        major_stats = pd.DataFrame()  # Create an empty DataFrame in case of error
+@st.cache_data(ttl=60, show_spinner=False)
+def load_major_stats() -> pd.DataFrame:
+    """Majors leaderboard as a display-ready frame, built once per TTL rather than per rerun"""
+    # Uncached fetch: this function is the only cache layer for majors data
+    major_stats = to_frame(fetch_json("/leaderboard/majors/"))
 
     # Rename columns
-    major_stats = major_stats.rename(columns={
+    return major_stats.rename(columns={
         "rank": "Rank",
         "major": "Major",
         "carbon_emissions_kg": "Total Emissions (kg CO2e)"
     })
 
+
+@st.fragment
+def render_major_table(major_stats: pd.DataFrame, num_entries: int):
+    """Paginated majors table; page changes rerun only this fragment"""
     # Pagination for major stats
     total_majors = len(major_stats)
     total_pages = (total_majors - 1) // num_entries + 1
     
     # Get current page from session state or default to 1
-    if 'major_page' not in st.session_state:
-        st.session_state.major_page = 1
-    
-    page = st.session_state.major_page
+    page = st.session_state.setdefault("major_page", 1)
     start_idx = (page - 1) * num_entries
     end_idx = start_idx + num_entries
     display_major_stats = major_stats.iloc[start_idx:end_idx].copy()
@@ -57,52 +54,51 @@ if group_by_major:
 
     st.table(display_major_stats)
 
-    # Page selector below the table
+    # Page selector below the table; work out the target page locally and
+    # touch session state only if it changed
     if total_pages > 1:
         col1, col2, col3, col4, col5 = st.columns([1, 2, 3, 2, 1])
         
         with col2:
-            if st.button("← Previous", disabled=(page <= 1), key="major_prev", use_container_width=True):
-                st.session_state.major_page = page - 1
-                st.rerun()
+            prev_clicked = st.button("← Previous", disabled=(page <= 1), key="major_prev", use_container_width=True)
         
         with col3:
-            new_page = st.selectbox("Page", range(1, total_pages + 1), index=page-1, key="major_page_selector", label_visibility="collapsed")
-            if new_page != st.session_state.major_page:
-                st.session_state.major_page = new_page
-                st.rerun()
+            selected_page = st.selectbox("Page", range(1, total_pages + 1), index=page-1, key="major_page_selector", label_visibility="collapsed")
         
         with col4:
-            if st.button("Next →", disabled=(page >= total_pages), key="major_next", use_container_width=True):
-                st.session_state.major_page = page + 1
-                st.rerun()
-else:
-    st.subheader("Highest Emissions by Student (Oct 2025)")
+            next_clicked = st.button("Next →", disabled=(page >= total_pages), key="major_next", use_container_width=True)
+
+        if prev_clicked:
+            new_page = page - 1
+        elif next_clicked:
+            new_page = page + 1
+        else:
+            new_page = selected_page
+
+        if new_page != page:
+            st.session_state.major_page = new_page
+            st.rerun(scope="fragment")
+
+
+@st.fragment
+def render_student_table(major_params: tuple, total_students: int, num_entries: int):
+    """One page of the student leaderboard; page changes rerun only this fragment"""
+    total_pages = max((total_students - 1) // num_entries + 1, 1)
+
+    # Get current page from session state or default to 1
+    page = min(st.session_state.setdefault("student_page", 1), total_pages)
+    start_idx = (page - 1) * num_entries
+    end_idx = start_idx + num_entries
 
     try:
-        df = pd.DataFrame(requests.get(f"{API_BASE_URL}/leaderboard/students/").json()) 
+        df = to_frame(get_json(
+            "/leaderboard/students/",
+            major_params + (("limit", num_entries), ("offset", start_idx)),
+        ))
     except requests.exceptions.RequestException:
         st.error("❌ Cannot connect to API")
         df = pd.DataFrame()  # Create an empty DataFrame in case of error
 
-    # Filter by major
-    majors = ["All"] + sorted(df["major"].unique().tolist())
-    selected_major = st.sidebar.selectbox("Filter by Major", majors)
-
-    # Filter by major
-    if selected_major != "All":
-        try:
-            df = pd.DataFrame(requests.get(f"{API_BASE_URL}/leaderboard/students/?major={selected_major}").json()) 
-        except requests.exceptions.RequestException:
-            st.error("❌ Cannot connect to API")
-            df = pd.DataFrame()  # Create an empty DataFrame in case of error
-    else:
-        try:
-            df = pd.DataFrame(requests.get(f"{API_BASE_URL}/leaderboard/students/").json()) 
-        except requests.exceptions.RequestException:
-            st.error("❌ Cannot connect to API")
-            df = pd.DataFrame()  # Create an empty DataFrame in case of error
-
     # Rename columns
     df = df.rename(columns={
         "rank": "Rank",
@@ -110,81 +106,90 @@ else:
         "carbon_emissions_kg": "Carbon Emissions (kg CO2e)",
         "major": "Major"
     })
-
-    # Pagination for student data
-    total_students = len(df)
-    total_pages = (total_students - 1) // num_entries + 1
-    
-    # Get current page from session state or default to 1
-    if 'student_page' not in st.session_state:
-        st.session_state.student_page = 1
-    
-    page = st.session_state.student_page
-    start_idx = (page - 1) * num_entries
-    end_idx = start_idx + num_entries
-    display_df = df.iloc[start_idx:end_idx].copy()
-    display_df = display_df.set_index("Rank")
+    # Already just this page, in a fixed column order
+    display_df = df.reindex(columns=["Rank", "Name", "Carbon Emissions (kg CO2e)", "wpi_id"])
 
     # Show pagination info
     if total_pages > 1:
         st.write(f"Showing students {start_idx + 1}-{min(end_idx, total_students)} of {total_students}")
 
-    # Render table-like rows where clicking the student's name navigates to a details page
-    # We'll render each row as columns with a clickable button so we can set query params
-    st.write("")
-    # Header row
-    c_rank, c_name, c_emissions, c_action = st.columns([1, 4, 3, 2])
-    # c_rank, c_name, c_major, c_emissions, c_action = st.columns([1, 4, 3, 3, 2])
-    c_rank.markdown("**Rank**")
-    c_name.markdown("**Name**")
-    # c_major.markdown("**Major**")
-    c_emissions.markdown("**Carbon Emissions (kg CO2e)**")
-    c_action.markdown("**Details**")
-
-    for idx, row in display_df.reset_index().iterrows():
-        rank = row["Rank"]
-        name = row.get("Name", "")
-        # major = row.get("Major", "")
-        emissions = row.get("Carbon Emissions (kg CO2e)", "")
-
-        c_rank, c_name, c_emissions, c_action = st.columns([1, 4, 3, 2])
-        # c_rank, c_name, c_major, c_emissions, c_action = st.columns([1, 4, 3, 3, 2])
-        c_rank.write(rank)
-        c_name.write(name)
-        # c_major.write(major)
-        c_emissions.write(emissions)
-
-        # Provide an explicit "View" button in the action column for clarity/accessibility
-        action_key = f"student_view_{rank}_{idx}"
-        if c_action.button("View", key=action_key):
-            # Set session storage variables for the selected student
-            st.session_state.selected_student = {
-                "rank": rank,
-                "name": name,
-                # "major": major,
-                "wpi_id": row.get("wpi_id", None)
-            }
-            st.switch_page("pages/details.py")
+    # One selectable table instead of a row of columns and a button per student;
+    # picking a row opens that student's details page
+    event = st.dataframe(
+        display_df,
+        column_config={"wpi_id": None},  # needed for navigation, not shown
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="student_table",
+    )
+    if event.selection.rows:
+        rank, name, emissions, wpi_id = display_df.iloc[event.selection.rows[0]]
+        # Carry the selection in the URL so the details page is linkable
+        st.switch_page("pages/details.py", query_params={"wpi_id": str(wpi_id), "name": name})
     
-    # Page selector below the table
+    # Page selector below the table; work out the target page locally and
+    # touch session state only if it changed
     if total_pages > 1:
         col1, col2, col3, col4, col5 = st.columns([1, 2, 3, 2, 1])
         
         with col2:
-            if st.button("← Previous", disabled=(page <= 1), key="student_prev", use_container_width=True):
-                st.session_state.student_page = page - 1
-                st.rerun()
+            prev_clicked = st.button("← Previous", disabled=(page <= 1), key="student_prev", use_container_width=True)
         
         with col3:
-            new_page = st.selectbox("Page", range(1, total_pages + 1), index=page-1, key="student_page_selector", label_visibility="collapsed")
-            if new_page != st.session_state.student_page:
-                st.session_state.student_page = new_page
-                st.rerun()
+            selected_page = st.selectbox("Page", range(1, total_pages + 1), index=page-1, key="student_page_selector", label_visibility="collapsed")
         
         with col4:
-            if st.button("Next →", disabled=(page >= total_pages), key="student_next", use_container_width=True):
-                st.session_state.student_page = page + 1
-                st.rerun()
+            next_clicked = st.button("Next →", disabled=(page >= total_pages), key="student_next", use_container_width=True)
+
+        if prev_clicked:
+            new_page = page - 1
+        elif next_clicked:
+            new_page = page + 1
+        else:
+            new_page = selected_page
+
+        if new_page != page:
+            st.session_state.student_page = new_page
+            st.rerun(scope="fragment")
+
+
+# Display the leaderboard
+if group_by_major:
+    st.subheader("Emissions by Major (Oct 2025)")
+
+    try:
+        major_stats = load_major_stats()
+    except requests.exceptions.RequestException:
+        st.error("❌ Cannot connect to API")
+        major_stats = pd.DataFrame()  # Create an empty DataFrame in case of error
+
+    render_major_table(major_stats, num_entries)
+else:
+    st.subheader("Highest Emissions by Student (Oct 2025)")
+
+    # Majors for the filter come from the plain majors list (shared with the
+    # timeline page's cache), so students are only fetched for the table
+    try:
+        majors_list = get_static_json("/timeline/majors/list")["majors"]
+    except requests.exceptions.RequestException:
+        st.error("❌ Cannot connect to API")
+        majors_list = []
+
+    # Filter by major
+    majors = ["All"] + majors_list
+    selected_major = st.sidebar.selectbox("Filter by Major", majors)
+    major_params = (("major", selected_major),) if selected_major != "All" else ()
+
+    # Pagination for student data: total count, then only the visible page
+    try:
+        total_students = get_json("/leaderboard/students/count", major_params)["total"]
+    except requests.exceptions.RequestException:
+        st.error("❌ Cannot connect to API")
+        total_students = 0
+
+    render_student_table(major_params, total_students, num_entries)
 
 # Footer
 st.markdown("---")
@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
 import requests
-import os
 from datetime import date
 
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+from api_client import get_live_json, get_static_json, to_frame
+from charts import downsample
 
 st.set_page_config(page_title="Timeline", page_icon="📈")
 
@@ -27,9 +27,7 @@ major_name = None
 if scope == "By Major":
     # Fetch list of majors
     try:
-        r = requests.get(f"{API_BASE_URL}/timeline/majors/list", timeout=6)
-        r.raise_for_status()
-        majors_resp = r.json()
+        majors_resp = get_static_json("/timeline/majors/list")
         majors = majors_resp.get("majors", [])
     except requests.exceptions.RequestException:
         st.error("❌ Could not fetch majors list from API")
@@ -68,12 +66,14 @@ def render_timeline(df: pd.DataFrame, interval: str):
     m2.metric("Total packages", int(total_packages))
     m3.metric("Periods shown", int(total_periods))
 
-    # Plot emissions over time
+    # Plot emissions over time; metrics above use every row, the chart only
+    # needs enough points to keep the shape
+    chart_df = downsample(df, "package_count")
     try:
-        plot_df = df.set_index("period")["package_count"].astype(float)
+        plot_df = chart_df.set_index("period")["package_count"].astype(float)
         st.area_chart(plot_df, x_label="Period", y_label="Number of Packages", use_container_width=True)
     except Exception:
-        st.line_chart(df.set_index("period")["package_count"], x_label="Period", y_label="Number of Packages", use_container_width=True)
+        st.line_chart(chart_df.set_index("period")["package_count"], x_label="Period", y_label="Number of Packages", use_container_width=True)
 
 if scope == "By Major":
     if not major_name:
@@ -82,11 +82,9 @@ if scope == "By Major":
         params = build_query_params(start_date, end_date, interval)
         params["major_name"] = major_name
         try:
-            r = requests.get(f"{API_BASE_URL}/timeline/major", params=params, timeout=8)
-            r.raise_for_status()
-            resp = r.json()
+            resp = get_live_json("/timeline/major", tuple(params.items()))
             timeline = resp.get("timeline", [])
-            df = pd.DataFrame(timeline)
+            df = to_frame(timeline)
             # remove rows where period is missing/None so charts/tables don't show them
             if "period" in df.columns:
                 df = df[df["period"].notnull() & (df["period"].astype(str) != "None")]
@@ -107,11 +105,9 @@ if scope == "By Major":
 else:
     params = build_query_params(start_date, end_date, interval, students_only=students_only)
     try:
-        r = requests.get(f"{API_BASE_URL}/timeline/all", params=params, timeout=8)
-        r.raise_for_status()
-        resp = r.json()
+        resp = get_live_json("/timeline/all", tuple(params.items()))
         timeline = resp.get("timeline", [])
-        df = pd.DataFrame(timeline)
+        df = to_frame(timeline)
         # remove rows where period is missing/None so charts/tables don't show them
         if "period" in df.columns:
             df = df[df["period"].notnull() & (df["period"].astype(str) != "None")]
@@ -1,41 +1,65 @@
 import streamlit as st
-import pandas as pd
 import requests
-import os
 
-# API configuration
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+from api_client import fetch_json, to_frame
 
 st.set_page_config(page_title="View Tables", page_icon="🗂️")
 
+
+# Rows fetched per table; the preview doesn't need whole tables in memory
+TABLE_ROW_LIMIT = 500
+
+
+# Table names almost never change, table contents do
+@st.cache_data(ttl=600, show_spinner=False)
+def list_tables() -> list:
+    return fetch_json("/db/tables", timeout=5)["tables"]
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def table_rows(name: str) -> list:
+    # One extra row tells us whether the table was cut off
+    return fetch_json(f"/db/tables/{name}", (("limit", TABLE_ROW_LIMIT + 1),), timeout=10)
+
+
+def with_stale_fallback(key: str, load, *args):
+    """Call a cached loader, serving this session's last good result if the API is unreachable"""
+    try:
+        value = load(*args)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        if key not in st.session_state:
+            raise
+        st.warning("⚠️ API unavailable, showing the last data loaded")
+        return st.session_state[key]
+    st.session_state[key] = value
+    return value
+
+
 st.markdown("# View Tables")
 
 # Fetch list of tables from the API
 try:
-    tables_response = requests.get(f"{API_BASE_URL}/db/tables")
-    if tables_response.status_code == 200:
-        tables_data = tables_response.json()
-        table_names = tables_data["tables"]
-
-        # Create a dropdown for table selection
-        selected_table = st.selectbox("Select a table to view", table_names)
-
-        if selected_table:
-            st.write(f"Fetching data for table: **{selected_table}**")
-            # Fetch data for the selected table
-            try:
-                table_data_response = requests.get(f"{API_BASE_URL}/db/tables/{selected_table}")
-                if table_data_response.status_code == 200:
-                    table_data = table_data_response.json()
-                    df = pd.DataFrame(table_data)
-                    st.dataframe(df)
-                else:
-                    st.error(
-                        f"Failed to fetch data for table '{selected_table}'. Status code: {table_data_response.status_code}")
-            except requests.exceptions.RequestException as e:
-                st.error(f"An error occurred while fetching data for table '{selected_table}': {e}")
-
-    else:
-        st.error(f"Failed to fetch list of tables. Status code: {tables_response.status_code}")
+    table_names = with_stale_fallback("view_tables_list", list_tables)
+
+    # Create a dropdown for table selection
+    selected_table = st.selectbox("Select a table to view", table_names)
+
+    if selected_table:
+        st.write(f"Fetching data for table: **{selected_table}**")
+        # Fetch data for the selected table
+        try:
+            table_data = with_stale_fallback(f"view_tables_rows_{selected_table}", table_rows, selected_table)
+            df = to_frame(table_data[:TABLE_ROW_LIMIT])
+            if len(table_data) > TABLE_ROW_LIMIT:
+                st.caption(f"Showing the first {TABLE_ROW_LIMIT} rows")
+            st.dataframe(df)
+        except requests.exceptions.HTTPError as e:
+            st.error(
+                f"Failed to fetch data for table '{selected_table}'. Status code: {e.response.status_code}")
+        except requests.exceptions.RequestException as e:
+            st.error(f"An error occurred while fetching data for table '{selected_table}': {e}")
+
+except requests.exceptions.HTTPError as e:
+    st.error(f"Failed to fetch list of tables. Status code: {e.response.status_code}")
 except requests.exceptions.RequestException as e:
     st.error(f"An error occurred while fetching the list of tables: {e}")